@@ -0,0 +1,84 @@
+"""
+Micro-benchmark: compiled IntentFilter vs the old keyword scan
+
+Run from backend/:
+    python benchmarks/bench_intent_filter.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.intent_filter import IntentFilter  # noqa: E402
+from services.restaurant_catalog import RestaurantCatalog  # noqa: E402
+from services.restaurant_lookup import FOOD_CATEGORIES  # noqa: E402
+
+LEGACY_KEYWORDS = [
+    "order", "get me", "i want", "food", "hungry",
+    "pizza", "burger", "sushi", "chinese", "italian",
+    "restaurant", "delivery", "doordash", "uber eats",
+    "usual", "lunch", "dinner", "breakfast"
+]
+
+# (utterance, is a real order)
+SAMPLES = [
+    ("Order a pepperoni pizza from Domino's", True),
+    ("Can you order me a burger from Five Guys", True),
+    ("Order my usual", True),
+    ("Get me some sushi for dinner", True),
+    ("I want pad thai delivered", True),
+    ("Could you order chinese food", True),
+    ("Get me an order of fries from In-N-Out", True),
+    ("Put in a DoorDash order for tacos", True),
+    ("I'm craving ramen, order some please", True),
+    ("Same as last time from Chipotle", True),
+    ("Order Chipotle", True),
+    ("Order McDonald's please", True),
+    ("order from five guys", True),
+    ("get me chipotle", True),
+    ("order lasagna", True),
+    ("Order Dunkin'", True),
+    ("We need to sort these files in order to finish", False),
+    ("Don't order anything, I already ate", False),
+    ("The meeting is right after lunch", False),
+    ("Put the slides in order", False),
+    ("We drove past Chipotle on the way home", False),
+    ("The printer is out of order again", False),
+    ("I want to finish this report today", False),
+    ("Let's grab coffee next week", False),
+    ("Did you see the restaurant review in the paper", False),
+    ("That's a court order, we have to comply", False),
+    ("Never mind, cancel that", False),
+]
+
+
+def legacy_is_food_intent(text: str) -> bool:
+    text_lower = text.lower()
+    return any(keyword in text_lower for keyword in LEGACY_KEYWORDS)
+
+
+def precision_recall(predict) -> tuple:
+    tp = sum(1 for text, label in SAMPLES if label and predict(text))
+    fp = sum(1 for text, label in SAMPLES if not label and predict(text))
+    fn = sum(1 for text, label in SAMPLES if label and not predict(text))
+    return tp / ((tp + fp) or 1), tp / ((tp + fn) or 1)
+
+
+def main():
+    intent_filter = IntentFilter(extra_phrases={
+        "restaurant": RestaurantCatalog.load().spoken_names(),
+        "food": [word for words in FOOD_CATEGORIES.values() for word in words],
+    })
+    texts = [text for text, _ in SAMPLES]
+    number = 2000
+
+    for name, predict in [("legacy any()", legacy_is_food_intent), ("IntentFilter", intent_filter.is_food_intent)]:
+        seconds = min(timeit.repeat(lambda: [predict(t) for t in texts], number=number, repeat=5))
+        per_call_us = seconds / (number * len(texts)) * 1e6
+        precision, recall = precision_recall(predict)
+        print(f"{name:14s}  {per_call_us:6.2f} µs/call   precision {precision:.2f}   recall {recall:.2f}")
+
+
+if __name__ == "__main__":
+    main()
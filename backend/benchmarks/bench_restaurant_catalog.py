@@ -0,0 +1,122 @@
+"""
+Benchmark: indexed RestaurantCatalog vs the old filter-and-sort lookup
+
+Builds synthetic catalogs of 10k and 100k restaurants (written to a temp
+JSON file so loading is measured too) and times best-restaurant lookups.
+Before that, checks how spoken names resolve against the real catalog:
+a wrong match sends the order to the wrong store, so the script exits
+non-zero if any case regresses.
+
+Run from backend/:
+    python benchmarks/bench_restaurant_catalog.py
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.restaurant_catalog import PRICE_LEVELS, RestaurantCatalog, RestaurantInfo  # noqa: E402
+from services.restaurant_lookup import FOOD_CATEGORIES  # noqa: E402
+
+CATEGORIES = list(FOOD_CATEGORIES)
+PRICES = list(PRICE_LEVELS)
+
+# (spoken name, expected catalog restaurant or None to keep the spoken name)
+NAME_CASES = [
+    ("dominoes", "Domino's Pizza"),
+    ("pf changs", "P.F. Chang's"),
+    ("in n out", "In-N-Out Burger"),
+    ("mc donalds", "McDonald's"),
+    ("taco bel", "Taco Bell"),
+    ("starbuck", "Starbucks"),
+    ("Pizza Express", None),
+    ("pizza place", None),
+    ("burger palace", None),
+]
+
+
+def synthetic_rows(count: int) -> list:
+    rng = random.Random(count)
+    return [
+        {
+            "name": f"Restaurant {i}",
+            "category": rng.choice(CATEGORIES),
+            "cuisine": "Various",
+            "rating": round(rng.uniform(3.0, 5.0), 2),
+            "price_range": rng.choice(PRICES),
+        }
+        for i in range(count)
+    ]
+
+
+def legacy_find(restaurants_by_category: dict, category: str, max_price: str):
+    """The old RestaurantLookupService.find_restaurant body"""
+    restaurants = restaurants_by_category[category]
+    max_level = PRICE_LEVELS.get(max_price, 3)
+    restaurants = [r for r in restaurants if PRICE_LEVELS.get(r.price_range, 1) <= max_level]
+    restaurants.sort(key=lambda x: x.rating, reverse=True)
+    return restaurants[0] if restaurants else None
+
+
+def check_names() -> int:
+    catalog = RestaurantCatalog.load()
+    failures = 0
+    for spoken, expected in NAME_CASES:
+        match = catalog.resolve(spoken)
+        actual = match.name if match else None
+        failures += actual != expected
+        print(f"{'ok  ' if actual == expected else 'FAIL'} {spoken!r:18} -> {actual or 'kept as spoken'}")
+    return failures
+
+
+def main():
+    failures = check_names()
+    print()
+
+    queries = [(c, p) for c in CATEGORIES for p in PRICES]
+
+    for count in (10_000, 100_000):
+        rows = synthetic_rows(count)
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            json.dump(rows, f)
+            path = f.name
+
+        try:
+            started = time.perf_counter()
+            catalog = RestaurantCatalog.load(path)
+            load_ms = (time.perf_counter() - started) * 1000
+        finally:
+            os.unlink(path)
+
+        legacy = {}
+        for row in rows:
+            legacy.setdefault(row["category"], []).append(
+                RestaurantInfo(row["name"], row["rating"], row["cuisine"], row["price_range"])
+            )
+
+        for category, price in queries:
+            assert catalog.best(category, price).rating == legacy_find(legacy, category, price).rating
+
+        number = 20 if count >= 100_000 else 200
+        legacy_us = timeit.timeit(
+            lambda: [legacy_find(legacy, c, p) for c, p in queries], number=number
+        ) / (number * len(queries)) * 1e6
+        indexed_us = timeit.timeit(
+            lambda: [catalog.best(c, p) for c, p in queries], number=number * 100
+        ) / (number * 100 * len(queries)) * 1e6
+
+        print(
+            f"{count:>7,} restaurants  load {load_ms:7.1f} ms   "
+            f"legacy {legacy_us:10.1f} µs/lookup   indexed {indexed_us:6.3f} µs/lookup"
+        )
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Rule-based fast path: labeled regression cases and parse timing
+
+Every case says what the rules must do with an utterance: commit to a
+parse (item, restaurant) at or above the confidence threshold, or leave
+it to Claude. A wrong confident parse skips Claude and places the wrong
+order, so the script exits non-zero if any case regresses.
+
+Run from backend/:
+    python benchmarks/bench_rule_parser.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.intent_filter import IntentFilter  # noqa: E402
+from services.restaurant_catalog import RestaurantCatalog  # noqa: E402
+from services.restaurant_lookup import FOOD_CATEGORIES  # noqa: E402
+from services.rule_parser import RuleBasedParser  # noqa: E402
+
+THRESHOLD = 0.85
+LLM = None  # the rules must not be confident; Claude handles it
+
+# (utterance, expected (food_item, restaurant) or LLM)
+CASES = [
+    ("Order a pepperoni pizza from Dominos", ("pepperoni pizza", "Domino's Pizza")),
+    ("Can you get me a burger from Five Guys", ("burger", "Five Guys")),
+    ("get me some sushi please", ("sushi", None)),
+    ("Order my usual", ("", None)),
+    ("Please order a pepperoni pizza from Dominos", ("pepperoni pizza", "Domino's Pizza")),
+    ("Hey, can you get me some sushi?", ("sushi", None)),
+    ("order a pizza but not from dominos", LLM),
+    ("Order a pizza and remind me to call mom tomorrow", LLM),
+    ("order me a salad, no dressing, for delivery to the office", LLM),
+    ("order a burger with no onions", LLM),
+    ("order a pizza from dominos and a coke", LLM),
+    ("order a poke bowl for me real quick", LLM),
+    ("order a pizza from the place down the street", LLM),
+    ("I don't want to order a pizza", LLM),
+    ("We should not order a pizza tonight", LLM),
+    ("Should I order a pizza?", LLM),
+    ("What if we order a pizza from Dominos", LLM),
+    ("Never order my usual again", LLM),
+    ("Don't order my usual", LLM),
+    ("Order a pizza from Dominos. Actually, never mind", LLM),
+]
+
+
+def build_parser() -> RuleBasedParser:
+    catalog = RestaurantCatalog.load()
+    intent_filter = IntentFilter()
+    food_words = [word for words in FOOD_CATEGORIES.values() for word in words]
+    return RuleBasedParser(
+        restaurants=catalog.names(),
+        food_words=food_words + intent_filter.phrases("food"),
+        resolve_restaurant=catalog.resolve
+    )
+
+
+def check(parser: RuleBasedParser) -> int:
+    failures = 0
+    for text, expected in CASES:
+        intent = parser.parse(text)
+        confident = intent is not None and intent.confidence >= THRESHOLD
+        actual = (intent.food_item, intent.restaurant) if confident else LLM
+
+        ok = actual == expected
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {text!r:62} -> {actual or 'Claude'}")
+    return failures
+
+
+def main():
+    parser = build_parser()
+    failures = check(parser)
+
+    texts = [text for text, _ in CASES]
+    number = 2000
+    seconds = min(timeit.repeat(lambda: [parser.parse(t) for t in texts], number=number, repeat=5))
+    print(f"\n{seconds / (number * len(texts)) * 1e6:.2f} µs/parse, {failures} failing case(s)")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,466 @@
+"""
+Load test: replay synthetic Omi traffic against the FastAPI app
+
+Generates conversations the way Omi sends them (each realtime webhook
+re-sends the session's segments so far, with start/end times) plus a
+share of memory-created webhooks, and drives the app with a fixed number
+of concurrent sessions. Reports requests/sec and p50/p95/p99 latency per
+endpoint.
+
+External services are replaced by local stand-ins with configurable
+latency:
+
+    Anthropic   fake AsyncAnthropic (create and streamed tool calls)
+    Omi API     httpx.MockTransport on the shared notification client
+    MultiOn     fake `multion` module (blocking browse, as the real SDK)
+    Redis       fakeredis with a per-round-trip delay (or --redis-url);
+                needs `pip install fakeredis`
+
+Run from backend/:
+    python benchmarks/load_test.py --sessions 200 --concurrency 20
+    python benchmarks/load_test.py --save baseline.json
+    python benchmarks/load_test.py --compare baseline.json
+
+Over HTTP (stand-ins installed in the server process):
+    python benchmarks/load_test.py --serve 8001
+    python benchmarks/load_test.py --url http://localhost:8001
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import time
+import types
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+
+# (utterance, what Claude would extract). Rule-parser hits and filtered-out
+# chatter never reach the stub, which is the point: the mix decides how
+# many requests pay for an LLM call.
+ORDERS = [
+    ("Order a pepperoni pizza from Domino's.", {"food_item": "pepperoni pizza", "restaurant": "Domino's"}),
+    ("Can you get me a burger from Five Guys?", {"food_item": "burger", "restaurant": "Five Guys"}),
+    ("Order my usual.", {"food_item": "", "quick_order": True}),
+    ("Get me some sushi for dinner.", {"food_item": "sushi", "cuisine": "Japanese"}),
+    ("I'm craving something spicy, could you order some pad thai?", {"food_item": "pad thai", "cuisine": "Thai"}),
+    ("Put in a DoorDash order for chicken tacos, no cilantro.", {
+        "food_item": "chicken tacos", "cuisine": "Mexican", "delivery_instructions": "no cilantro"
+    }),
+    ("Could you order a poke bowl, something cheap?", {
+        "food_item": "poke bowl", "suggested_restaurant": "Pokeworks", "price_tier": "$"
+    }),
+    ("I want a vegan bowl from Sweetgreen delivered.", {
+        "food_item": "vegan bowl", "restaurant": "Sweetgreen", "dietary_restrictions": ["vegan"]
+    }),
+]
+
+CHATTER = [
+    "So how was the meeting this morning?",
+    "I think we should put the slides in order first.",
+    "The printer is out of order again.",
+    "Let's grab coffee next week.",
+    "Did you finish the report?",
+    "Yeah, I'll send it over after lunch.",
+    "That sounds good to me.",
+    "Never mind, I already ate.",
+]
+
+SUGGESTIONS = ["Pokeworks", "Sweetgreen", "Chipotle", "Panda Express", "Shake Shack"]
+
+PREFERENCES = {
+    "favorite_cuisines": ["Italian", "Thai"],
+    "favorite_restaurants": ["Domino's"],
+    "dietary_preferences": [],
+    "favorite_dishes": ["pepperoni pizza"],
+}
+
+INTENT_BY_UTTERANCE = {text: intent for text, intent in ORDERS}
+
+
+class Latency:
+    """Uniform delay of mean ± jitter (fraction of the mean), in milliseconds"""
+
+    def __init__(self, mean_ms: float, jitter: float = 0.3):
+        self.mean = mean_ms / 1000
+        self.jitter = jitter
+
+    def sample(self) -> float:
+        return max(0.0, random.uniform(self.mean * (1 - self.jitter), self.mean * (1 + self.jitter)))
+
+    async def sleep(self) -> None:
+        if self.mean:
+            await asyncio.sleep(self.sample())
+
+
+class StubCalls:
+    """Calls made to each stand-in"""
+
+    def __init__(self):
+        self.counts = defaultdict(int)
+
+    def __call__(self, name: str) -> None:
+        self.counts[name] += 1
+
+
+CALLS = StubCalls()
+
+
+# -- Anthropic ---------------------------------------------------------------
+
+def _ns(**fields):
+    return types.SimpleNamespace(**fields)
+
+
+def _usage(request: dict, output: str):
+    prompt = "".join(m["content"] for m in request["messages"])
+    return _ns(input_tokens=len(prompt) // 4 + 1, output_tokens=len(output) // 4 + 1)
+
+
+def _tool_input(request: dict) -> dict:
+    prompt = request["messages"][-1]["content"]
+    match = re.search(r'Voice command: "(.*)"', prompt)
+    intent = INTENT_BY_UTTERANCE.get(match.group(1) if match else "", {"food_item": "pizza"})
+    return {
+        "quick_order": False,
+        "restaurant": None,
+        "suggested_restaurant": None,
+        "price_tier": None,
+        "cuisine": None,
+        "dietary_restrictions": [],
+        "delivery_instructions": None,
+        "confidence": 0.9,
+        **intent,
+    }
+
+
+def _response(request: dict):
+    if request.get("tools"):
+        tool_input = _tool_input(request)
+        text = json.dumps(tool_input)
+        block = _ns(type="tool_use", id="toolu_bench", name=request["tools"][0]["name"], input=tool_input)
+    else:
+        prompt = request["messages"][-1]["content"]
+        text = random.choice(SUGGESTIONS) if "chain restaurant" in prompt else json.dumps(PREFERENCES)
+        block = _ns(type="text", text=text)
+    return _ns(content=[block], usage=_usage(request, text), stop_reason="end_turn"), text
+
+
+class _FakeStream:
+    """messages.stream(): the tool input arrives as input_json_delta chunks"""
+
+    def __init__(self, request: dict, latency: Latency):
+        self.response, self.text = _response(request)
+        self.latency = latency
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def __aiter__(self):
+        total = self.latency.sample()
+        chunks = [self.text[i:i + 12] for i in range(0, len(self.text), 12)]
+        # Roughly 40% of the time to the first token, the rest spread over the chunks
+        await asyncio.sleep(total * 0.4)
+        for chunk in chunks:
+            await asyncio.sleep(total * 0.6 / len(chunks))
+            yield _ns(type="content_block_delta", index=0, delta=_ns(type="input_json_delta", partial_json=chunk))
+
+    async def get_final_message(self):
+        return self.response
+
+
+class FakeAnthropic:
+    """Stands in for anthropic.AsyncAnthropic"""
+
+    latency = Latency(0)
+
+    def __init__(self, **kwargs):
+        self.messages = self
+
+    async def create(self, **request):
+        CALLS("anthropic")
+        await self.latency.sleep()
+        return _response(request)[0]
+
+    def stream(self, **request):
+        CALLS("anthropic")
+        return _FakeStream(request, self.latency)
+
+
+# -- MultiOn -----------------------------------------------------------------
+
+class FakeMultiOn:
+    """Stands in for multion.MultiOn (browse blocks, like the real SDK)"""
+
+    latency = Latency(0)
+
+    def __init__(self, api_key=None):
+        pass
+
+    def browse(self, cmd: str, url: str, max_steps: int = 10):
+        CALLS("multion")
+        time.sleep(self.latency.sample())
+        return _ns(status="DONE", message="Checkout reached")
+
+
+# -- Omi API -----------------------------------------------------------------
+
+def omi_client(latency: Latency) -> httpx.AsyncClient:
+    async def handle(request: httpx.Request) -> httpx.Response:
+        CALLS("omi")
+        await latency.sleep()
+        return httpx.Response(200, json={"status": "sent"})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handle))
+
+
+# -- Redis -------------------------------------------------------------------
+
+def fake_redis_connect(latency: Latency):
+    """StorageService.connect replacement backed by one shared fakeredis server"""
+    import fakeredis
+    from fakeredis.aioredis import FakeAsyncRedisConnection
+
+    class SlowConnection(FakeAsyncRedisConnection):
+        # One delay per round trip (a pipeline is sent as one packed command)
+        async def send_packed_command(self, command, check_health=True):
+            await latency.sleep()
+            await super().send_packed_command(command, check_health)
+
+    server = fakeredis.FakeServer()
+
+    async def connect(self) -> bool:
+        self.redis_client = fakeredis.FakeAsyncRedis(
+            server=server, decode_responses=True, connection_class=SlowConnection
+        )
+        self._save_last_order_script = self.redis_client.register_script(self.SAVE_LAST_ORDER_LUA)
+        return True
+
+    return connect
+
+
+def install_stubs(args):
+    """Swap external services for the stand-ins; returns the app"""
+    os.environ.update(
+        ANTHROPIC_API_KEY="bench", OMI_API_KEY="bench", OMI_APP_ID="bench", MULTION_API_KEY="bench",
+        LOG_LEVEL=os.getenv("LOG_LEVEL", "WARNING")
+    )
+
+    FakeAnthropic.latency = Latency(args.llm_ms)
+    FakeMultiOn.latency = Latency(args.multion_ms)
+    sys.modules["multion"] = types.SimpleNamespace(MultiOn=FakeMultiOn)
+
+    import main
+    from services import intent_parser, restaurant_lookup, storage
+
+    intent_parser.AsyncAnthropic = FakeAnthropic
+    restaurant_lookup.AsyncAnthropic = FakeAnthropic
+    main.create_http_client = lambda: omi_client(Latency(args.omi_ms))
+    if args.redis_url:
+        os.environ["REDIS_URL"] = args.redis_url
+    else:
+        storage.StorageService.connect = fake_redis_connect(Latency(args.redis_ms))
+
+    return main.app
+
+
+# -- Traffic -----------------------------------------------------------------
+
+def segment(text: str, start: float, user: bool = True) -> dict:
+    # ~2.5 words per second of speech
+    end = round(start + max(0.6, len(text.split()) / 2.5), 2)
+    return {
+        "text": text, "speaker": "SPEAKER_0" if user else "SPEAKER_1",
+        "speaker_id": 0 if user else 1, "is_user": user, "start": start, "end": end,
+    }
+
+
+def transcript_session(rng: random.Random, session_id: str, order_ratio: float) -> list:
+    """
+    Realtime webhooks for one conversation
+
+    Every payload carries all segments so far, as Omi sends them. Some
+    conversations include an order, at a random point.
+    """
+    turns = [rng.choice(CHATTER) for _ in range(rng.randint(1, 4))]
+    if rng.random() < order_ratio:
+        turns.insert(rng.randint(0, len(turns)), rng.choice(ORDERS)[0])
+
+    segments, clock, requests = [], 0.0, []
+    for text in turns:
+        # The other person sometimes talks in between
+        if rng.random() < 0.3:
+            segments.append(segment(rng.choice(CHATTER), clock, user=False))
+            clock = segments[-1]["end"] + rng.uniform(0.2, 1.0)
+        segments.append(segment(text, clock))
+        clock = segments[-1]["end"] + rng.uniform(0.2, 1.5)
+        requests.append(("/webhook/transcript", {"session_id": session_id, "segments": list(segments)}))
+    return requests
+
+
+def memory_request(rng: random.Random, index: int) -> tuple:
+    lines = [rng.choice(CHATTER + [text for text, _ in ORDERS]) for _ in range(rng.randint(5, 60))]
+    segments, clock = [], 0.0
+    for text in lines:
+        segments.append(segment(text, clock, user=rng.random() < 0.6))
+        clock = segments[-1]["end"] + rng.uniform(0.2, 2.0)
+    return ("/webhook/memory", {
+        "uid": f"bench_user_{rng.randrange(50)}",
+        "memory": {
+            "id": f"bench_memory_{index}",
+            "created_at": "2025-01-01T12:00:00Z",
+            "transcript": " ".join(lines),
+            "transcript_segments": segments,
+        },
+    })
+
+
+def build_workload(args) -> list:
+    """One list of requests per session; each list is replayed in order"""
+    rng = random.Random(args.seed)
+    run = f"{int(time.time())}"
+    workload = []
+    for i in range(args.sessions):
+        if rng.random() < args.memory_ratio:
+            workload.append([memory_request(rng, f"{run}_{i}")])
+        else:
+            workload.append(transcript_session(rng, f"bench_{run}_{i}", args.order_ratio))
+    return workload
+
+
+# -- Driver ------------------------------------------------------------------
+
+def percentile(values: list, p: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, int(round(p / 100 * len(values))) - 1))]
+
+
+async def drive(client: httpx.AsyncClient, workload: list, concurrency: int) -> dict:
+    latencies = defaultdict(list)
+    statuses = defaultdict(lambda: defaultdict(int))
+    sessions: asyncio.Queue = asyncio.Queue()
+    for requests in workload:
+        sessions.put_nowait(requests)
+
+    async def worker():
+        while not sessions.empty():
+            for path, body in sessions.get_nowait():
+                start = time.perf_counter()
+                try:
+                    response = await client.post(path, json=body)
+                    outcome = str(response.status_code)
+                    if response.status_code < 300:
+                        outcome = response.json().get("status", outcome)
+                except httpx.HTTPError as e:
+                    outcome = type(e).__name__
+                latencies[path].append((time.perf_counter() - start) * 1000)
+                statuses[path][outcome] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    report = {}
+    for path, values in sorted(latencies.items()):
+        values.sort()
+        report[path] = {
+            "requests": len(values),
+            "rps": round(len(values) / elapsed, 1),
+            "p50_ms": round(percentile(values, 50), 1),
+            "p95_ms": round(percentile(values, 95), 1),
+            "p99_ms": round(percentile(values, 99), 1),
+            "max_ms": round(values[-1], 1),
+            "statuses": dict(statuses[path]),
+        }
+    return {"elapsed_s": round(elapsed, 2), "endpoints": report}
+
+
+async def run_in_process(args, workload: list) -> dict:
+    app = install_stubs(args)
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=args.timeout) as client:
+            return await drive(client, workload, args.concurrency)
+
+
+async def run_over_http(args, workload: list) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        return await drive(client, workload, args.concurrency)
+
+
+def print_report(result: dict, baseline: dict = None) -> None:
+    print(f"\n{'endpoint':<22}{'reqs':>7}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for path, row in result["endpoints"].items():
+        print(
+            f"{path:<22}{row['requests']:>7}{row['rps']:>9}{row['p50_ms']:>10}"
+            f"{row['p95_ms']:>10}{row['p99_ms']:>10}{row['max_ms']:>10}"
+        )
+        print(f"{'':<22}{', '.join(f'{k}: {v}' for k, v in sorted(row['statuses'].items()))}")
+
+        before = (baseline or {}).get("endpoints", {}).get(path)
+        if before:
+            deltas = [
+                f"{key} {(row[key] - before[key]) / before[key] * 100:+.0f}%"
+                for key in ("rps", "p50_ms", "p95_ms", "p99_ms") if before[key]
+            ]
+            print(f"{'  vs baseline':<22}{', '.join(deltas)}")
+
+    print(f"\n{result['elapsed_s']}s total")
+    if result.get("stub_calls"):
+        print("stand-in calls: " + ", ".join(f"{k}: {v}" for k, v in sorted(result["stub_calls"].items())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay synthetic Omi webhook traffic and report latency")
+    parser.add_argument("--sessions", type=int, default=200, help="Conversations/memories to send (default: 200)")
+    parser.add_argument("--concurrency", type=int, default=20, help="Sessions in flight at once (default: 20)")
+    parser.add_argument("--order-ratio", type=float, default=0.5, help="Share of conversations with an order")
+    parser.add_argument("--memory-ratio", type=float, default=0.1, help="Share of sessions that are memory webhooks")
+    parser.add_argument("--seed", type=int, default=1, help="Workload random seed")
+    parser.add_argument("--timeout", type=float, default=30, help="Per-request timeout in seconds")
+    parser.add_argument("--llm-ms", type=float, default=600, help="Stub Claude latency (default: 600)")
+    parser.add_argument("--omi-ms", type=float, default=80, help="Stub Omi API latency (default: 80)")
+    parser.add_argument("--multion-ms", type=float, default=2000, help="Stub MultiOn latency (default: 2000)")
+    parser.add_argument("--redis-ms", type=float, default=0.5, help="Stub Redis round-trip latency (default: 0.5)")
+    parser.add_argument("--redis-url", help="Use a real Redis instead of fakeredis")
+    parser.add_argument("--url", help="Drive a running server over HTTP instead of in process")
+    parser.add_argument("--serve", type=int, metavar="PORT", help="Run the app with stand-ins on PORT")
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Show changes against a saved JSON result")
+    args = parser.parse_args()
+
+    if args.serve:
+        import uvicorn
+        uvicorn.run(install_stubs(args), host="127.0.0.1", port=args.serve, log_level="warning")
+        return
+
+    workload = build_workload(args)
+    runner = run_over_http if args.url else run_in_process
+    result = asyncio.run(runner(args, workload))
+    result["stub_calls"] = dict(CALLS.counts)
+    result["args"] = {k: v for k, v in vars(args).items() if k not in ("save", "compare")}
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(result, baseline)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,11 @@ FoodVoice - Voice-activated food ordering for Omi
 Main FastAPI application
 """
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
+import asyncio
 import os
+import time
 from dotenv import load_dotenv
 
 from models import RealtimeWebhook, MemoryCreated, OrderResult
@@ -14,42 +16,136 @@ from services import (
     StorageService,
     OrderService,
     OmiNotificationService,
-    RestaurantLookupService
+    RestaurantLookupService,
+    RuleBasedParser,
+    IntentFilter,
+    TwoTierCache,
+    NotificationOutbox,
+    OrderJobQueue,
+    MemoryJobQueue,
+    StageGraph,
+    IdempotentRequests,
+    Endpointer,
+    LLMAdmission,
+    AdmissionDenied,
+    RestaurantInfo,
+    create_http_client
 )
+from services.log import debug_sampled, get_logger, new_request_id, request_id_var, setup_logging, shutdown_logging
+from services.metrics import REGISTRY, STAGE_SECONDS, format_metric
+from services.restaurant_catalog import slugify
 
 # Load environment variables
 load_dotenv()
 
+# JSON logs, written by a background thread
+setup_logging()
+logger = get_logger("api")
+
 # Initialize services (will be set up in lifespan)
 intent_parser = None
 storage = None
 order_service = None
 notification_service = None
 restaurant_lookup = None
+notification_outbox = None
+order_jobs = None
+memory_jobs = None
+idempotency = None
+endpointer = None
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Initialize services on startup"""
-    global intent_parser, storage, order_service, notification_service, restaurant_lookup
+    global intent_parser, storage, order_service, notification_service, restaurant_lookup, notification_outbox, order_jobs, memory_jobs
+    global idempotency, endpointer
 
-    print("🚀 Starting FoodVoice API...")
+    setup_logging()
+    logger.info("Starting FoodVoice API")
 
     # Initialize all services
-    intent_parser = IntentParser()
     storage = StorageService()
+    if await storage.connect() and os.getenv("MIGRATE_PROFILES_ON_STARTUP", "false").lower() == "true":
+        logger.info("Migrated %d legacy profiles", await storage.migrate_profiles())
+
+    restaurant_lookup = RestaurantLookupService(
+        suggestion_cache=TwoTierCache(
+            "restaurant_suggestion",
+            storage=storage if os.getenv("SUGGESTION_CACHE_REDIS", "true").lower() == "true" else None,
+            maxsize=int(os.getenv("SUGGESTION_CACHE_SIZE", 512)),
+            ttl=int(os.getenv("SUGGESTION_CACHE_TTL", 7 * 24 * 3600))
+        )
+    )
+
+    # Keyword pre-filter -> rule-based fast path -> intent cache -> admission -> Claude
+    intent_filter = IntentFilter(extra_phrases={
+        "restaurant": restaurant_lookup.spoken_names(),
+        "food": restaurant_lookup.food_words(),
+    })
+    intent_parser = IntentParser(
+        intent_filter=intent_filter,
+        rule_parser=RuleBasedParser(
+            restaurants=restaurant_lookup.restaurant_names(),
+            food_words=restaurant_lookup.food_words() + intent_filter.phrases("food"),
+            resolve_restaurant=restaurant_lookup.resolve_restaurant
+        ),
+        cache=TwoTierCache(
+            "intent",
+            storage=storage if os.getenv("INTENT_CACHE_REDIS", "true").lower() == "true" else None,
+            maxsize=int(os.getenv("INTENT_CACHE_SIZE", 1024)),
+            ttl=int(os.getenv("INTENT_CACHE_TTL", 3600))
+        ),
+        admission=LLMAdmission(storage=storage)
+    )
     order_service = OrderService()
-    notification_service = OmiNotificationService()
-    restaurant_lookup = RestaurantLookupService()
 
-    print("✅ All services initialized")
-    print(f"🔑 Omi API Key: {os.getenv('OMI_API_KEY')[:20]}...")
-    print(f"🤖 Claude API: {'✓' if os.getenv('ANTHROPIC_API_KEY') else '✗'}")
-    print(f"🤖 MultiOn API: {'✓' if os.getenv('MULTION_API_KEY') else '✗ (using deep links)'}")
+    # Hold partial speech until the user finishes the sentence
+    endpointer = Endpointer() if os.getenv("ENDPOINTING", "true").lower() == "true" else None
+
+    # Omi retries slow webhooks - replay the first response instead of re-running it
+    idempotency = IdempotentRequests(
+        storage=storage if os.getenv("IDEMPOTENCY_REDIS", "true").lower() == "true" else None
+    )
+
+    # One pooled HTTP client for the life of the app
+    notification_service = OmiNotificationService(client=create_http_client())
+
+    # Notifications are queued and delivered by background workers
+    notification_outbox = NotificationOutbox(notification_service, storage)
+    notification_service.outbox = notification_outbox
+    notification_outbox.start()
+
+    # Browser-automation orders run in a bounded background pool
+    order_jobs = OrderJobQueue(order_service, storage, notification_service)
+    order_jobs.start()
+
+    # Memory webhooks are processed in the background, with their own LLM
+    # concurrency cap so they don't compete with realtime parsing
+    memory_jobs = MemoryJobQueue(
+        IntentParser(max_concurrency=int(os.getenv("MEMORY_LLM_CONCURRENCY", 2))),
+        storage,
+        notification_service
+    )
+    memory_jobs.start()
+
+    logger.info("All services initialized", extra={
+        "omi_api": bool(os.getenv("OMI_API_KEY")),
+        "claude_api": bool(os.getenv("ANTHROPIC_API_KEY")),
+        "multion_api": bool(os.getenv("MULTION_API_KEY")),
+    })
 
     yield
 
-    print("👋 Shutting down...")
+    logger.info("Shutting down")
+    if endpointer:
+        await endpointer.stop()
+    await memory_jobs.stop()
+    await order_jobs.stop()
+    await notification_outbox.stop()
+    await notification_service.close()
+    await storage.close()
+    shutdown_logging()
 
 
 # Create FastAPI app
@@ -61,6 +157,20 @@ app = FastAPI(
 )
 
 
+@app.middleware("http")
+async def assign_request_id(request: Request, call_next):
+    """Tag every log line for a request with one id (X-Request-ID if the caller sent one)"""
+    request_id = request.headers.get("x-request-id")
+    if request_id:
+        request_id_var.set(request_id)
+    else:
+        request_id = new_request_id()
+
+    response = await call_next(request)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+
 @app.get("/")
 async def root():
     """Health check endpoint"""
@@ -71,7 +181,9 @@ async def root():
         "endpoints": {
             "realtime": "/webhook/transcript",
             "memory": "/webhook/memory",
-            "health": "/health"
+            "health": "/health",
+            "metrics": "/metrics",
+            "order_status": "/orders/{job_id}"
         }
     }
 
@@ -88,6 +200,19 @@ async def health_check():
             "notification_service": notification_service is not None,
             "restaurant_lookup": restaurant_lookup is not None,
         },
+        "caches": {
+            "intent": intent_parser.cache.stats() if intent_parser else None,
+            "restaurant_suggestion": restaurant_lookup.suggestion_cache.stats() if restaurant_lookup else None,
+        },
+        "notifications": await notification_outbox.stats() if notification_outbox else None,
+        "pending_orders": order_jobs.pending() if order_jobs else None,
+        "memory_jobs": await memory_jobs.stats() if memory_jobs else None,
+        "idempotency": idempotency.stats() if idempotency else None,
+        "llm": {
+            "in_flight": intent_parser.in_flight,
+            "waiting": intent_parser.waiting,
+            **intent_parser.admission.stats(),
+        } if intent_parser else None,
         "config": {
             "claude_api": bool(os.getenv("ANTHROPIC_API_KEY")),
             "omi_api": bool(os.getenv("OMI_API_KEY")),
@@ -96,25 +221,189 @@ async def health_check():
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics: stage/LLM/Omi histograms plus cache and queue counters"""
+    caches = {
+        "intent": intent_parser.cache.stats() if intent_parser else None,
+        "restaurant_suggestion": restaurant_lookup.suggestion_cache.stats() if restaurant_lookup else None,
+    }
+    caches = {name: stats for name, stats in caches.items() if stats}
+    notifications = await notification_outbox.stats() if notification_outbox else {}
+    memory = await memory_jobs.stats() if memory_jobs else {}
+    requests = idempotency.stats() if idempotency else {}
+    admission = intent_parser.admission.stats() if intent_parser else {}
+
+    derived = [
+        format_metric("foodvoice_cache_lookups_total", "counter", "Cache lookups by cache and result", [
+            ({"cache": name, "result": result}, stats[key])
+            for name, stats in caches.items()
+            for result, key in (("local_hit", "local_hits"), ("redis_hit", "redis_hits"), ("miss", "misses"))
+        ]),
+        format_metric("foodvoice_cache_hit_ratio", "gauge", "Cache hit ratio since startup", [
+            ({"cache": name}, stats["hit_ratio"]) for name, stats in caches.items()
+        ]),
+        format_metric("foodvoice_notifications_total", "counter", "Notification deliveries by outcome", [
+            ({"outcome": outcome}, notifications[outcome])
+            for outcome in ("delivered", "retries", "failed") if outcome in notifications
+        ]),
+        format_metric("foodvoice_queue_depth", "gauge", "Items waiting in background queues", [
+            ({"queue": name}, depth) for name, depth in (
+                ("notifications", notifications.get("queued")),
+                ("memory_jobs", memory.get("queued")),
+                ("orders", order_jobs.pending() if order_jobs else None),
+            ) if depth is not None
+        ]),
+        format_metric("foodvoice_idempotent_requests_total", "counter", "Transcript webhooks by how they were answered", [
+            ({"result": result}, requests[result])
+            for result in ("computed", "joined", "replayed", "in_progress") if result in requests
+        ]),
+        format_metric("foodvoice_llm_admission_total", "counter", "Realtime LLM calls admitted, rate limited or shed", [
+            ({"result": result}, count) for result, count in admission.items()
+        ]),
+        format_metric("foodvoice_llm_concurrency", "gauge", "Realtime LLM calls in flight and waiting for a slot", [
+            ({"state": "in_flight"}, intent_parser.in_flight),
+            ({"state": "waiting"}, intent_parser.waiting),
+        ] if intent_parser else []),
+    ]
+
+    return REGISTRY.render() + "".join(derived)
+
+
 @app.post("/webhook/transcript")
 async def handle_realtime_transcript(webhook: RealtimeWebhook):
     """
     Handle real-time transcript from Omi device
 
-    This is called continuously as the user speaks
+    This is called continuously as the user speaks. Retries of a payload
+    (same session and segments) get the first response instead of
+    parsing and ordering again.
     """
+    return await idempotency.run(webhook.idempotency_key(), lambda: process_transcript(webhook))
+
+
+async def process_transcript(webhook: RealtimeWebhook) -> dict:
+    """Parse a realtime payload and place the order, if there is one"""
+
+    # Stages run as soon as their inputs are ready; timings are per stage
+    started = time.perf_counter()
+    graph = StageGraph()
+
+    # Lookups started speculatively while the intent streams in
+    speculative = {}
+
+    def cancel_speculative(key):
+        task = speculative.pop(key, None)
+        if task:
+            task.cancel()
+
+    async def find_restaurant(order_intent):
+        # The speculative lookup ran before the cuisine was known (and is
+        # only reused for the price tier it was started with)
+        task = speculative.pop(("restaurant", order_intent.food_item, order_intent.price_tier), None)
+        if task and not order_intent.cuisine:
+            return await task
+        if task:
+            task.cancel()
+        return await restaurant_lookup.find_restaurant(
+            order_intent.food_item,
+            order_intent.cuisine,
+            suggested=order_intent.suggested_restaurant,
+            price_tier=order_intent.price_tier
+        )
 
     try:
-        # Extract user speech
-        user_text = webhook.get_user_text()
+        # Get session context to extract uid (or use a default for testing)
+        graph.add("session", lambda: storage.get_session_context(webhook.session_id))
+        session_context = await graph.result("session")
+        uid = session_context.get("uid", "test_user")
 
-        if not user_text:
-            return {"status": "no_speech", "message": "No user speech detected"}
+        # One order per session - ignore the rest of the conversation
+        if session_context.get("order_placed"):
+            return {"status": "already_ordered", "message": "Order already placed for this session"}
+
+        # Only look at segments we haven't processed yet
+        new_segments = webhook.get_new_user_segments(session_context.get("cursor", 0.0))
+
+        # (held partial speech may complete now the other speaker took the turn,
+        # and a deferred utterance is retried)
+        if not new_segments and not session_context.get("pending") and not session_context.get("deferred_text"):
+            return {"status": "no_speech", "message": "No new user speech detected"}
+
+        session_context["cursor"] = max((s.end for s in new_segments), default=session_context.get("cursor", 0.0))
+
+        # Only completed utterances are parsed; partial speech waits in the session
+        if endpointer:
+            user_text = endpointer.feed(session_context, new_segments, webhook.segments)
+            # Omi goes quiet when the user does, so release held speech on a timer
+            delay = endpointer.flush_delay(session_context)
+            if delay is not None:
+                endpointer.schedule(
+                    webhook.session_id,
+                    delay,
+                    lambda: process_transcript(RealtimeWebhook(session_id=webhook.session_id, segments=[]))
+                )
+        else:
+            user_text = " ".join(s.text for s in new_segments)
 
-        print(f"📝 Transcript: {user_text}")
+        # An utterance shed while the LLM was overloaded goes in front of this one
+        user_text = " ".join(t for t in (session_context.pop("deferred_text", ""), user_text) if t)
 
-        # Parse for food ordering intent
-        order_intent = intent_parser.parse_food_order(user_text)
+        graph.add("save_cursor", lambda: storage.save_session_context(webhook.session_id, session_context))
+
+        if not user_text:
+            return {"status": "listening", "message": "Waiting for the end of the utterance"}
+
+        debug_sampled(logger, "Transcript", session_id=webhook.session_id, text=user_text)
+
+        # Parse for food ordering intent, starting lookups as soon as the
+        # fields they depend on stream in
+        streamed = {}
+
+        def on_field(field, value):
+            streamed[field] = value
+            if field == "restaurant" and value and restaurant_lookup.resolve_restaurant(value):
+                # Named a known restaurant - no need to pick one
+                for key in [k for k in speculative if k[0] == "restaurant"]:
+                    cancel_speculative(key)
+            elif field in ("food_item", "suggested_restaurant", "price_tier"):
+                # Start the lookup once the food, Claude's pick and its price
+                # tier are in (without the tier an unknown pick would be priced "$$")
+                food_item = streamed.get("food_item")
+                if (
+                    food_item and not streamed.get("restaurant")
+                    and "suggested_restaurant" in streamed and "price_tier" in streamed
+                ):
+                    price_tier = streamed["price_tier"]
+                    speculative["restaurant", food_item, price_tier] = asyncio.create_task(
+                        restaurant_lookup.find_restaurant(
+                            food_item,
+                            suggested=streamed["suggested_restaurant"],
+                            price_tier=price_tier
+                        )
+                    )
+
+        # Cursor save, profile read and intent parse are independent
+        if intent_parser.intent_filter.is_food_intent(user_text):
+            # Last order is only needed for "order my usual", but reading it
+            # alongside the parse means a quick order never waits on it
+            graph.add("profile", lambda: storage.get_last_order(uid))
+        # Rate limited per user; sessions without a known uid are limited on their own
+        llm_user = session_context.get("uid", webhook.session_id)
+        graph.add("intent", lambda: intent_parser.parse_food_order(user_text, on_field=on_field, uid=llm_user))
+
+        try:
+            order_intent = await graph.result("intent")
+        except AdmissionDenied as denied:
+            if denied.reason == "rate_limited":
+                # This device is over its LLM budget - treat it like chatter
+                return {"status": "no_intent", "reason": "rate_limited", "message": "No food order detected"}
+
+            # Overloaded: keep the utterance and parse it with the session's next payload
+            session_context["deferred_text"] = user_text
+            await graph.result("save_cursor")
+            await storage.save_session_context(webhook.session_id, session_context)
+            return {"status": "deferred", "message": "Busy - will retry with the next transcript"}
 
         if not order_intent:
             return {
@@ -122,21 +411,20 @@ async def handle_realtime_transcript(webhook: RealtimeWebhook):
                 "message": "No food order detected"
             }
 
-        print(f"🍕 Order intent detected: {order_intent.food_item}")
-        print(f"   Restaurant: {order_intent.restaurant or 'Any'}")
-        print(f"   Confidence: {order_intent.confidence}")
-
-        # Get session context to extract uid (or use a default for testing)
-        session_context = storage.get_session_context(webhook.session_id)
-        uid = session_context.get("uid", "test_user")
+        logger.info("Order intent detected", extra={
+            "uid": uid,
+            "food_item": order_intent.food_item,
+            "restaurant": order_intent.restaurant,
+            "confidence": order_intent.confidence,
+        })
 
         # Handle "order my usual"
         if order_intent.quick_order:
-            profile = storage.get_user_profile(uid)
+            last_order = await graph.result("profile")
 
-            if profile.last_order:
-                print("🔄 Quick order: using last order")
-                order_intent = profile.last_order
+            if last_order:
+                logger.info("Quick order: using last order", extra={"uid": uid})
+                order_intent = last_order
             else:
                 # No previous order
                 await notification_service.send_notification(
@@ -148,114 +436,150 @@ async def handle_realtime_transcript(webhook: RealtimeWebhook):
                     "message": "No previous order found"
                 }
 
-        # Look up restaurant if not specified
-        if not order_intent.restaurant:
-            restaurant_info = restaurant_lookup.find_restaurant(
-                order_intent.food_item,
-                order_intent.cuisine
-            )
+        async def lookup_restaurant():
+            # Look up restaurant if not specified
+            if not order_intent.restaurant:
+                restaurant_info = await find_restaurant(order_intent)
+                if restaurant_info:
+                    order_intent.restaurant = restaurant_info.name
+                    order_intent.restaurant_slug = restaurant_info.slug
+                    logger.info("Found restaurant %s (rating %s)", restaurant_info.name, restaurant_info.rating)
+                return restaurant_info
+
+            # Resolve the spoken name ("dominoes") to the catalog entry
+            restaurant_info = restaurant_lookup.resolve_restaurant(order_intent.restaurant)
             if restaurant_info:
                 order_intent.restaurant = restaurant_info.name
-                print(f"🔍 Found restaurant: {restaurant_info.name} (rating: {restaurant_info.rating})")
-        else:
-            # Get restaurant info for existing restaurant
-            restaurant_info = restaurant_lookup.find_restaurant(
-                order_intent.food_item,
-                order_intent.cuisine
+                order_intent.restaurant_slug = restaurant_info.slug
+                return restaurant_info
+
+            # Unknown or ambiguous name - keep what the user said rather than
+            # guess a store; price it from Claude's tier or a comparable restaurant
+            order_intent.restaurant_slug = slugify(order_intent.restaurant)
+            if order_intent.price_tier:
+                return RestaurantInfo(order_intent.restaurant, 4.3, order_intent.cuisine or "Various", order_intent.price_tier)
+            return await find_restaurant(order_intent)
+
+        def estimate_price(restaurant_info):
+            if restaurant_info:
+                return restaurant_lookup.estimate_price(order_intent.food_item, restaurant_info)
+            return "$15-25"
+
+        def send_voice_confirmation(price_estimate):
+            # Send voice confirmation first (mimics real confirmation flow)
+            return notification_service.send_order_confirmation_voice(
+                uid,
+                restaurant=order_intent.restaurant or "a highly rated restaurant",
+                food_item=order_intent.food_item,
+                price=price_estimate
             )
 
-        # Estimate price
-        if restaurant_info:
-            price_estimate = restaurant_lookup.estimate_price(order_intent.food_item, restaurant_info)
-        else:
-            price_estimate = "$15-25"
-
-        # Generate order summary
-        summary = order_service.get_order_summary(order_intent)
-        print(f"📋 Order summary: {summary}")
-
-        # Send voice confirmation first (mimics real confirmation flow)
-        restaurant_name = order_intent.restaurant or "a highly rated restaurant"
-        await notification_service.send_order_confirmation_voice(
-            uid,
-            restaurant=restaurant_name,
-            food_item=order_intent.food_item,
-            price=price_estimate
-        )
+        def save_last_order(*_):
+            # Save as last order, marking the session done so later payloads short-circuit
+            session_context["order_placed"] = True
+            return storage.save_last_order(
+                uid,
+                order_intent,
+                session_id=webhook.session_id,
+                session_context=session_context
+            )
 
-        # Place order
-        result = order_service.place_order(order_intent)
+        def send_confirmation(summary, submitted, *_):
+            # Send final confirmation with link (after the voice confirmation)
+            _, result = submitted
+            return notification_service.send_order_confirmation(uid, summary, result.deep_link)
 
-        # Save as last order
-        storage.save_last_order(uid, order_intent)
+        graph.add("restaurant", lookup_restaurant)
+        graph.add("price", estimate_price, after=["restaurant"])
+        graph.add("summary", lambda _: order_service.get_order_summary(order_intent), after=["restaurant"])
+        graph.add("confirm_voice", send_voice_confirmation, after=["price"])
 
-        # Send final confirmation with link
-        await notification_service.send_order_confirmation(
-            uid,
-            summary,
-            result.deep_link
-        )
+        # Place order in the background - the deep link is usable right away
+        graph.add("submit", lambda _: order_jobs.submit(uid, order_intent), after=["restaurant"])
+        graph.add("save", save_last_order, after=["restaurant", "save_cursor"])
+        graph.add("confirm", send_confirmation, after=["summary", "submit", "confirm_voice"])
+
+        summary = await graph.result("summary")
+
+        job_id, result = await graph.result("submit")
+        await graph.result("save")
+        await graph.result("confirm")
+
+        logger.info("Order placed", extra={"uid": uid, "summary": summary, "job_id": job_id, "timings_ms": dict(graph.timings)})
 
         return {
             "status": "success",
             "order": order_intent.model_dump(),
             "result": result.model_dump(),
+            "job_id": job_id,
+            "timings_ms": graph.timings,
             "message": f"Order placed: {summary}"
         }
 
     except Exception as e:
-        print(f"❌ Error handling transcript: {e}")
+        logger.exception("Error handling transcript")
         raise HTTPException(status_code=500, detail=str(e))
 
+    finally:
+        # Speculative work the final intent didn't need
+        for key in list(speculative):
+            cancel_speculative(key)
+        # (the cursor still has to be saved if we returned early)
+        await graph.cancel(keep=["save_cursor"])
+
+        for stage, ms in graph.timings.items():
+            STAGE_SECONDS.observe(ms / 1000, handler="transcript", stage=stage)
+        STAGE_SECONDS.observe(time.perf_counter() - started, handler="transcript", stage="total")
+
 
-@app.post("/webhook/memory")
+@app.post("/webhook/memory", status_code=202)
 async def handle_memory_created(webhook: MemoryCreated):
     """
-    Handle memory creation webhook - extract food preferences
+    Handle memory creation webhook - queue food preference extraction
 
-    This is called after a conversation is completed and saved as a memory
+    This is called after a conversation is completed and saved as a memory.
+    Extraction runs in the background (MemoryJobQueue); this only enqueues.
     """
 
+    if not webhook.memory.transcript and not webhook.memory.transcript_segments:
+        return {"status": "no_transcript"}
+
     try:
-        print(f"🧠 Memory created for user: {webhook.uid}")
+        with STAGE_SECONDS.time(handler="memory", stage="enqueue"):
+            status = await memory_jobs.enqueue(webhook)
 
-        # Extract full conversation text
-        conversation = webhook.memory.transcript
+    except Exception as e:
+        logger.exception("Error queueing memory")
+        raise HTTPException(status_code=500, detail=str(e))
 
-        if not conversation:
-            return {"status": "no_transcript"}
+    if status == "unavailable":
+        # Not queued and not claimed: a 5xx makes Omi retry
+        logger.error("Memory queue unavailable", extra={"uid": webhook.uid, "memory_id": webhook.memory.id})
+        raise HTTPException(status_code=503, detail="Memory queue unavailable, retry later")
 
-        # Extract food preferences from conversation
-        preferences = intent_parser.extract_preferences(conversation)
+    logger.info("Memory %s", status, extra={"uid": webhook.uid, "memory_id": webhook.memory.id})
 
-        print(f"📊 Extracted preferences: {preferences}")
+    return {
+        "status": status,
+        "memory_id": webhook.memory.id
+    }
 
-        # Update user profile
-        if any(preferences.values()):
-            storage.update_preferences(webhook.uid, preferences)
 
-            # Send notification about learned preferences
-            if preferences.get("favorite_restaurants"):
-                restaurants = ", ".join(preferences["favorite_restaurants"][:3])
-                await notification_service.send_notification(
-                    webhook.uid,
-                    f"I learned you like: {restaurants}! I'll remember that for next time."
-                )
+@app.get("/orders/{job_id}")
+async def get_order_status(job_id: str):
+    """Get the status of a background order placement job"""
+    job = await order_jobs.get(job_id)
 
-        return {
-            "status": "success",
-            "preferences": preferences
-        }
+    if not job:
+        raise HTTPException(status_code=404, detail="Order job not found")
 
-    except Exception as e:
-        print(f"❌ Error handling memory: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    return job.model_dump()
 
 
 @app.get("/profile/{uid}")
 async def get_user_profile(uid: str):
     """Get user profile (for debugging)"""
-    profile = storage.get_user_profile(uid)
+    profile = await storage.get_user_profile(uid)
     return profile.model_dump()
 
 
@@ -276,20 +600,18 @@ async def setup_user_profile(uid: str, request: Request):
     try:
         data = await request.json()
 
-        profile = storage.get_user_profile(uid)
-
-        # Update fields
-        if "delivery_address" in data:
-            profile.delivery_address = data["delivery_address"]
-        if "phone" in data:
-            profile.phone = data["phone"]
-        if "favorite_restaurants" in data:
-            profile.favorite_restaurants = data["favorite_restaurants"]
-        if "dietary_preferences" in data:
-            profile.dietary_preferences = data["dietary_preferences"]
+        # Update only the fields that were sent
+        fields = {
+            name: data[name]
+            for name in ("delivery_address", "phone", "favorite_restaurants", "dietary_preferences")
+            if name in data
+        }
 
         # Save
-        storage.save_user_profile(profile)
+        if not await storage.update_profile_fields(uid, fields):
+            raise ValueError("Failed to save profile")
+
+        profile = await storage.get_user_profile(uid)
 
         return {
             "status": "success",
@@ -304,7 +626,7 @@ async def setup_user_profile(uid: str, request: Request):
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Catch all exceptions"""
-    print(f"❌ Unhandled exception: {exc}")
+    logger.error("Unhandled exception: %s", exc, exc_info=exc)
     return JSONResponse(
         status_code=500,
         content={
@@ -319,8 +641,7 @@ if __name__ == "__main__":
 
     port = int(os.getenv("PORT", 8000))
 
-    print(f"🚀 Starting server on port {port}...")
-    print(f"📖 Docs: http://localhost:{port}/docs")
+    logger.info("Starting server on port %d (docs at http://localhost:%d/docs)", port, port)
 
     uvicorn.run(
         "main:app",
@@ -14,7 +14,7 @@ image = (
         "uvicorn[standard]==0.27.0",
         "pydantic==2.5.3",
         "pydantic-settings==2.1.0",
-        "anthropic==0.18.1",
+        "anthropic==0.34.2",
         "redis==5.0.1",
         "httpx==0.26.0",
         "python-dotenv==1.0.0",
@@ -22,6 +22,10 @@ image = (
         "playwright==1.40.0",
     )
     .run_commands("playwright install chromium")
+    # Shared intent pre-filter, its trigger vocabulary and the restaurant catalog
+    .copy_local_dir("models", "/root/models")
+    .copy_local_dir("services", "/root/services")
+    .copy_local_dir("data", "/root/data")
 )
 
 # Define secrets
@@ -47,6 +51,13 @@ def fastapi_app():
     from anthropic import Anthropic
     import json
     import httpx
+    from services.intent_filter import IntentFilter
+    from services.restaurant_catalog import RestaurantCatalog
+    from services.restaurant_lookup import FOOD_CATEGORIES
+    from services.log import debug_sampled, get_logger, setup_logging
+
+    setup_logging()
+    logger = get_logger("modal")
 
     # Models
     class TranscriptSegment(BaseModel):
@@ -87,15 +98,15 @@ def fastapi_app():
                 if restaurant:
                     # Search for specific restaurant on DoorDash
                     search_query = f"{restaurant} DoorDash"
-                    print(f"🔍 Building link for: {restaurant}")
+                    logger.debug("Building link for restaurant %s", restaurant)
                 elif food_item:
                     # Search for food type
                     search_query = f"{food_item} DoorDash near me"
-                    print(f"🔍 Building link for: {food_item}")
+                    logger.debug("Building link for food %s", food_item)
                 elif cuisine:
                     # Search for cuisine type
                     search_query = f"{cuisine} food DoorDash"
-                    print(f"🔍 Building link for: {cuisine}")
+                    logger.debug("Building link for cuisine %s", cuisine)
                 else:
                     return "https://www.doordash.com/"
 
@@ -104,11 +115,11 @@ def fastapi_app():
                 encoded_query = search_query.replace(" ", "+")
                 lucky_link = f"https://www.google.com/search?q={encoded_query}&btnI=1"
 
-                print(f"✅ Generated search link: {search_query}")
+                logger.info("Generated search link: %s", search_query)
                 return lucky_link
 
-            except Exception as e:
-                print(f"❌ Error: {e}")
+            except Exception:
+                logger.exception("Error building DoorDash link")
                 # Ultimate fallback
                 return "https://www.doordash.com/"
 
@@ -116,16 +127,19 @@ def fastapi_app():
         def __init__(self):
             api_key = os.getenv("ANTHROPIC_API_KEY")
             if not api_key:
-                print("⚠️ WARNING: ANTHROPIC_API_KEY not set!")
+                logger.warning("ANTHROPIC_API_KEY not set")
             self.client = Anthropic(api_key=api_key)
+            self.intent_filter = IntentFilter(extra_phrases={
+                "restaurant": RestaurantCatalog.load().spoken_names(),
+                "food": [word for words in FOOD_CATEGORIES.values() for word in words],
+            })
 
         def parse_food_order(self, text: str) -> Optional[OrderIntent]:
             # Always try to parse if text mentions food - be permissive!
             if not self._is_food_intent(text):
-                print(f"⚠️ No food keywords found in: {text}")
                 return None
 
-            print(f"✓ Food intent detected, parsing with Claude...")
+            logger.debug("Food intent detected, parsing with Claude")
 
             prompt = f"""
 You are a food ordering assistant. Parse this voice command into structured order data.
@@ -160,9 +174,8 @@ Return ONLY valid JSON:
                     messages=[{"role": "user", "content": prompt}]
                 )
 
-                # Debug: print the raw response
                 response_text = response.content[0].text
-                print(f"🤖 Claude raw response (full): {response_text}")
+                debug_sampled(logger, "Claude raw response", response=response_text)
 
                 # Strip markdown code blocks if present
                 if response_text.strip().startswith("```"):
@@ -173,11 +186,10 @@ Return ONLY valid JSON:
                     end_idx = response_text.rfind('}')
                     if start_idx != -1 and end_idx != -1:
                         response_text = response_text[start_idx:end_idx+1]
-                    print(f"🔧 Stripped markdown, now: {response_text[:100]}")
 
                 # Try to parse JSON
                 result = json.loads(response_text)
-                print(f"✓ Parsed order: {result.get('food_item', 'unknown')}")
+                logger.info("Parsed order: %s", result.get("food_item", "unknown"))
 
                 return OrderIntent(
                     food_item=result.get("food_item") or "",
@@ -188,30 +200,22 @@ Return ONLY valid JSON:
                     delivery_instructions=result.get("delivery_instructions"),
                     confidence=result.get("confidence", 0.0)
                 )
-            except Exception as e:
-                print(f"❌ Error parsing intent: {e}")
-                print(f"❌ Response was: {response.content[0].text if 'response' in locals() else 'No response'}")
+            except Exception:
+                logger.exception("Error parsing intent")
+                if "response" in locals():
+                    debug_sampled(logger, "Unparseable Claude response", response=response.content[0].text)
                 return None
 
         def _is_food_intent(self, text: str) -> bool:
-            text_lower = text.lower()
-
-            # MUST have one of these strong trigger phrases
-            strong_triggers = [
-                "order food", "order a", "order me", "order my",
-                "can you order", "could you order",  # Added conversational triggers
-                "get food", "buy food", "foodvoice",
-                "doordash", "uber eats", "grubhub"
-            ]
+            # Same scored trigger vocabulary as the main app - words like
+            # "order" or "food" alone stay below the threshold
+            score = self.intent_filter.score(text)
 
-            has_strong_trigger = any(trigger in text_lower for trigger in strong_triggers)
-
-            if has_strong_trigger:
-                print(f"✓ Food order trigger detected")
+            if score >= self.intent_filter.threshold:
+                logger.debug("Food order trigger detected (score %.2f)", score)
                 return True
 
-            # Don't trigger on random words like "order" or "food" alone
-            print(f"ℹ️ No food order trigger - skipping")
+            logger.debug("No food order trigger - skipping (score %.2f)", score)
             return False
 
     class StorageService:
@@ -229,15 +233,18 @@ Return ONLY valid JSON:
             return None
 
     # Initialize services immediately
-    print("🚀 Starting FoodVoice API...")
+    logger.info("Starting FoodVoice API")
     try:
         intent_parser = IntentParser()
         storage = StorageService()
         doordash_finder = DoorDashFinder()
-        print("✅ All services initialized")
-        print(f"🔑 API Keys - Claude: {bool(os.getenv('ANTHROPIC_API_KEY'))}, Omi: {bool(os.getenv('OMI_API_KEY'))}, Bright Data: {bool(os.getenv('BRIGHT_DATA_API_KEY'))}")
-    except Exception as e:
-        print(f"❌ Error initializing services: {e}")
+        logger.info("All services initialized", extra={
+            "claude_api": bool(os.getenv("ANTHROPIC_API_KEY")),
+            "omi_api": bool(os.getenv("OMI_API_KEY")),
+            "bright_data_api": bool(os.getenv("BRIGHT_DATA_API_KEY"))
+        })
+    except Exception:
+        logger.exception("Error initializing services")
         intent_parser = None
         storage = StorageService()
         doordash_finder = None
@@ -279,35 +286,29 @@ Return ONLY valid JSON:
     @app.post("/webhook/transcript")
     async def handle_realtime_transcript(webhook: RealtimeWebhook):
         try:
-            # Debug: print raw webhook data
-            print(f"🔍 Raw webhook received - session: {webhook.session_id}, segments: {len(webhook.segments)}")
-
-            # Print each segment's details
-            for i, seg in enumerate(webhook.segments):
-                print(f"  Segment {i}: text='{seg.text}', is_user={seg.is_user}, speaker={seg.speaker}")
+            debug_sampled(
+                logger,
+                "Raw webhook",
+                session_id=webhook.session_id,
+                segments=[seg.model_dump() for seg in webhook.segments]
+            )
 
             user_text = webhook.get_user_text()
-            print(f"📝 Extracted text: '{user_text}' (length: {len(user_text)})")
-
             if not user_text:
-                print("⚠️ Empty transcript, skipping")
                 return {"status": "no_speech"}
 
-            print(f"📝 Processing: {user_text}")
-
             # Check if intent parser is available
             if intent_parser is None:
-                print("❌ Intent parser not initialized")
+                logger.error("Intent parser not initialized")
                 return {"status": "error", "message": "Intent parser not available"}
 
             # Parse for food ordering intent
             order_intent = intent_parser.parse_food_order(user_text)
             if not order_intent:
-                print(f"ℹ️ No food order detected in: {user_text}")
                 # DON'T send notification for non-food conversations
                 return {"status": "no_intent"}
 
-            print(f"🍕 Order intent detected: {order_intent.food_item}")
+            logger.info("Order intent detected: %s", order_intent.food_item)
 
             uid = "test_user"  # Simple for now
 
@@ -315,7 +316,7 @@ Return ONLY valid JSON:
             if order_intent.quick_order:
                 last_order = storage.get_last_order(uid)
                 if last_order:
-                    print("🔄 Quick order: using last order")
+                    logger.info("Quick order: using last order")
                     order_intent = last_order
                 else:
                     return {"status": "no_previous_order"}
@@ -330,7 +331,6 @@ Return ONLY valid JSON:
                 summary = f"{search_term} from {restaurant}"
 
             # Find actual DoorDash store link
-            print("🔍 Finding DoorDash store...")
             deep_link = await doordash_finder.find_store(
                 food_item=order_intent.food_item,
                 restaurant=order_intent.restaurant,
@@ -339,14 +339,13 @@ Return ONLY valid JSON:
 
             # deep_link should now have the real DoorDash store URL from Bright Data scraping
             if not deep_link:
-                print("⚠️ No deep link found, using generic DoorDash URL")
+                logger.warning("No deep link found, using generic DoorDash URL")
                 deep_link = "https://www.doordash.com/"
 
             # Save as last order
             storage.save_last_order(uid, order_intent)
 
-            print(f"📋 Order placed: {summary}")
-            print(f"🔗 Deep link: {deep_link}")
+            logger.info("Order placed", extra={"summary": summary, "deep_link": deep_link})
 
             # Prepare response with notification
             response_message = f"🍕 {summary}\n\n{deep_link}"
@@ -356,17 +355,17 @@ Return ONLY valid JSON:
             }
 
         except Exception as e:
-            print(f"❌ Error: {e}")
+            logger.exception("Error handling transcript")
             raise HTTPException(status_code=500, detail=str(e))
 
     @app.post("/webhook/memory")
     async def handle_memory_created(request: Request):
         try:
             data = await request.json()
-            print(f"🧠 Memory created: {data.get('uid', 'unknown')}")
+            logger.info("Memory created", extra={"uid": data.get("uid", "unknown")})
             return {"status": "success"}
         except Exception as e:
-            print(f"❌ Error: {e}")
+            logger.exception("Error handling memory")
             return {"status": "error", "message": str(e)}
 
     return app
@@ -19,7 +19,7 @@ image = (
         "uvicorn[standard]==0.27.0",
         "pydantic==2.5.3",
         "pydantic-settings==2.1.0",
-        "anthropic==0.18.1",
+        "anthropic==0.34.2",
         "redis==5.0.1",
         "httpx==0.26.0",
         "python-dotenv==1.0.0",
@@ -1,5 +1,5 @@
 from .omi_webhook import TranscriptSegment, RealtimeWebhook, MemoryCreated
-from .order import OrderIntent, UserProfile, OrderResult
+from .order import OrderIntent, UserProfile, OrderResult, OrderJob
 
 __all__ = [
     "TranscriptSegment",
@@ -8,4 +8,5 @@ __all__ = [
     "OrderIntent",
     "UserProfile",
     "OrderResult",
+    "OrderJob",
 ]
@@ -1,4 +1,5 @@
 """Pydantic models for Omi webhook payloads"""
+import hashlib
 from pydantic import BaseModel, Field
 from typing import List, Optional
 
@@ -22,6 +23,31 @@ class RealtimeWebhook(BaseModel):
         """Extract all user speech as single string"""
         return " ".join([s.text for s in self.segments if s.is_user])
 
+    def get_new_user_segments(self, cursor: float) -> List[TranscriptSegment]:
+        """
+        Get user segments that ended after the session cursor
+
+        Omi re-sends the whole realtime payload for a session, so segments
+        ending at or before the cursor have already been processed.
+        """
+        return [s for s in self.segments if s.is_user and s.end > cursor]
+
+    def idempotency_key(self) -> str:
+        """
+        Identify this exact payload: session id plus a fingerprint of its segment range
+
+        A retried webhook carries the same segments and gets the same key;
+        the next payload of the session (more segments, or revised text)
+        gets a new one.
+        """
+        digest = hashlib.sha1()
+        for s in self.segments:
+            digest.update(f"{s.start:.3f}|{s.end:.3f}|{int(s.is_user)}|{s.text}\n".encode())
+
+        first = self.segments[0].start if self.segments else 0.0
+        last = self.segments[-1].end if self.segments else 0.0
+        return f"{self.session_id}:{first:.2f}-{last:.2f}:{digest.hexdigest()[:16]}"
+
 
 class Memory(BaseModel):
     """Memory structure from Omi"""
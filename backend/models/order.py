@@ -1,6 +1,6 @@
 """Pydantic models for food ordering"""
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, Field
+from typing import Literal, Optional, List
 from datetime import datetime
 
 
@@ -8,11 +8,14 @@ class OrderIntent(BaseModel):
     """Parsed food order intent from voice"""
     food_item: str
     restaurant: Optional[str] = None
+    restaurant_slug: Optional[str] = None  # DoorDash store slug, set once resolved
+    suggested_restaurant: Optional[str] = None  # Claude's pick when no restaurant was named
+    price_tier: Optional[Literal["$", "$$", "$$$"]] = None  # for the named/suggested restaurant
     cuisine: Optional[str] = None
     dietary_restrictions: List[str] = []
     quick_order: bool = False  # "order my usual"
     delivery_instructions: Optional[str] = None
-    confidence: float = 0.0  # 0-1 confidence score
+    confidence: float = Field(0.0, ge=0, le=1)  # 0-1 confidence score
 
 
 class FavoriteOrder(BaseModel):
@@ -44,3 +47,14 @@ class OrderResult(BaseModel):
     eta: Optional[str] = None
     tracking_url: Optional[str] = None
     deep_link: Optional[str] = None  # For fallback ordering
+
+
+class OrderJob(BaseModel):
+    """Background order placement job"""
+    job_id: str
+    uid: str
+    status: str  # "queued", "running", "completed", "failed", "timed_out"
+    order: OrderIntent
+    result: Optional[OrderResult] = None  # provisional deep link until completed
+    created_at: datetime
+    updated_at: datetime
@@ -0,0 +1,204 @@
+"""
+Backfill user preferences from exported Omi memories
+
+Streams a JSONL file of MemoryCreated records (one webhook payload per
+line) through IntentParser.extract_memory_preferences and writes the
+results with StorageService.update_preferences. Notifications are not
+sent.
+
+Records are processed in batches. Within a batch, extractions run
+concurrently (bounded by --concurrency) and each user's preferences are
+merged so every user gets one profile write per batch. After each batch
+the byte offset is checkpointed, so an interrupted run picks up where it
+stopped (re-running a partial batch is harmless: preference writes are
+idempotent).
+
+A record whose extraction fails (timeout, API or JSON error), or whose
+user's profile write fails, is appended to a retry file before the
+checkpoint moves past it. Feed that file back in to retry them:
+
+Run from backend/:
+    python scripts/backfill_preferences.py memories.jsonl --concurrency 8
+    python scripts/backfill_preferences.py memories.jsonl.failed
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv  # noqa: E402
+from pydantic import ValidationError  # noqa: E402
+
+from models import MemoryCreated  # noqa: E402
+from services import IntentParser, StorageService  # noqa: E402
+from services.preferences import merge_preferences  # noqa: E402
+
+
+def load_checkpoint(path: str) -> dict:
+    checkpoint = {"offset": 0, "records": 0, "skipped": 0, "failed": 0}
+    if os.path.exists(path):
+        with open(path) as f:
+            checkpoint.update(json.load(f))
+    return checkpoint
+
+
+def save_checkpoint(path: str, checkpoint: dict) -> None:
+    # Write-then-rename so a crash never leaves a truncated checkpoint
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp, path)
+
+
+def read_batch(f, batch_size: int) -> tuple:
+    """Read up to batch_size non-empty lines; returns (lines, offset after them)"""
+    lines = []
+    while len(lines) < batch_size:
+        line = f.readline()
+        if not line:
+            break
+        if line.strip():
+            lines.append(line)
+    return lines, f.tell()
+
+
+async def process_batch(lines: list, intent_parser: IntentParser, storage: StorageService, concurrency: int) -> tuple:
+    """
+    Extract and store preferences for one batch
+
+    Returns:
+        (records processed, records skipped, failed lines, users written)
+    """
+    memories = []
+    skipped = 0
+    for line in lines:
+        try:
+            memories.append((line, MemoryCreated.model_validate_json(line)))
+        except ValidationError as e:
+            skipped += 1
+            print(f"⚠️ Skipping invalid record: {e.errors()[0]['msg']}")
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def extract(webhook: MemoryCreated) -> dict:
+        async with semaphore:
+            return await intent_parser.extract_memory_preferences(webhook.memory, raise_errors=True)
+
+    results = await asyncio.gather(*(extract(webhook) for _, webhook in memories), return_exceptions=True)
+
+    # One write per user: merge their memories in file order
+    by_user = defaultdict(list)
+    lines_by_user = defaultdict(list)
+    failed = []
+    for (line, webhook), preferences in zip(memories, results):
+        if isinstance(preferences, BaseException):
+            failed.append(line)
+            print(f"⚠️ Extraction failed for memory {webhook.memory.id}: {preferences!r}")
+            continue
+        by_user[webhook.uid].append(preferences)
+        lines_by_user[webhook.uid].append(line)
+
+    writes = {uid: merge_preferences(partials) for uid, partials in by_user.items()}
+    writes = {uid: prefs for uid, prefs in writes.items() if any(prefs.values())}
+    written = await asyncio.gather(*(storage.update_preferences(uid, prefs) for uid, prefs in writes.items()))
+
+    # A failed write loses every memory merged into it - retry them all
+    for uid, ok in zip(writes, written):
+        if not ok:
+            failed.extend(lines_by_user[uid])
+            print(f"⚠️ Profile write failed for user {uid} ({len(lines_by_user[uid])} records)")
+
+    return len(memories) - len(failed), skipped, failed, sum(written)
+
+
+def append_lines(path: str, lines: list) -> None:
+    """Append lines and flush them to disk before the checkpoint moves past them"""
+    with open(path, "a") as f:
+        f.writelines(line if line.endswith("\n") else line + "\n" for line in lines)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+async def backfill(args) -> int:
+    """Run the backfill; returns how many records have failed in total"""
+    checkpoint_path = args.checkpoint or f"{args.path}.checkpoint"
+    retry_path = args.retry_file or f"{args.path}.failed"
+    if args.reset:
+        for path in (checkpoint_path, retry_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    checkpoint = load_checkpoint(checkpoint_path)
+    if checkpoint["offset"]:
+        print(f"↩️ Resuming at byte {checkpoint['offset']} ({checkpoint['records']} records done)")
+
+    storage = StorageService()
+    await storage.connect()
+    intent_parser = IntentParser(max_concurrency=args.concurrency)
+
+    started = time.perf_counter()
+    processed = 0
+
+    try:
+        with open(args.path) as f:
+            f.seek(checkpoint["offset"])
+
+            while True:
+                lines, offset = read_batch(f, args.batch_size)
+                if not lines:
+                    break
+
+                records, skipped, failed, users = await process_batch(lines, intent_parser, storage, args.concurrency)
+
+                if failed:
+                    append_lines(retry_path, failed)
+
+                processed += records
+                checkpoint.update(
+                    offset=offset,
+                    records=checkpoint["records"] + records,
+                    skipped=checkpoint["skipped"] + skipped,
+                    failed=checkpoint["failed"] + len(failed)
+                )
+                save_checkpoint(checkpoint_path, checkpoint)
+
+                elapsed = time.perf_counter() - started
+                print(
+                    f"📦 {checkpoint['records']} records ({users} users written, {len(failed)} failed this batch) - "
+                    f"{processed / elapsed:.1f} records/sec"
+                )
+    finally:
+        await storage.close()
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"✅ Done: {processed} records this run in {elapsed:.1f}s "
+        f"({processed / elapsed if elapsed else 0:.1f} records/sec), {checkpoint['skipped']} skipped in total"
+    )
+    if checkpoint["failed"]:
+        print(f"⚠️ {checkpoint['failed']} records failed; retry them with: {retry_path}")
+    return checkpoint["failed"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backfill preferences from a JSONL export of Omi memories")
+    parser.add_argument("path", help="JSONL file, one MemoryCreated payload per line")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent extractions (default: 8)")
+    parser.add_argument("--batch-size", type=int, default=200, help="Records per batch/checkpoint (default: 200)")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <path>.checkpoint)")
+    parser.add_argument("--retry-file", help="Where failed records are appended (default: <path>.failed)")
+    parser.add_argument("--reset", action="store_true", help="Ignore any checkpoint and retry file and start over")
+    args = parser.parse_args()
+
+    load_dotenv()
+    failed = asyncio.run(backfill(args))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
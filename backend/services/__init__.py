@@ -1,14 +1,44 @@
 from .intent_parser import IntentParser
+from .intent_filter import IntentFilter
+from .rule_parser import RuleBasedParser
 from .storage import StorageService
 from .order_service import OrderService
-from .omi_notifications import OmiNotificationService
+from .omi_notifications import OmiNotificationService, create_http_client
 from .restaurant_lookup import RestaurantLookupService, RestaurantInfo
+from .restaurant_catalog import RestaurantCatalog
+from .trigram_index import TrigramIndex
+from .cache import LRUTTLCache, TwoTierCache
+from .work_queue import WorkQueue
+from .notification_outbox import NotificationOutbox
+from .order_jobs import OrderJobQueue
+from .memory_jobs import MemoryJobQueue
+from .pipeline import StageGraph
+from .idempotency import IdempotentRequests
+from .endpointing import Endpointer
+from .rate_limit import AdmissionDenied, LLMAdmission, TokenBucket
 
 __all__ = [
     "IntentParser",
+    "IntentFilter",
+    "RuleBasedParser",
     "StorageService",
     "OrderService",
     "OmiNotificationService",
+    "create_http_client",
     "RestaurantLookupService",
     "RestaurantInfo",
+    "RestaurantCatalog",
+    "TrigramIndex",
+    "LRUTTLCache",
+    "TwoTierCache",
+    "WorkQueue",
+    "NotificationOutbox",
+    "OrderJobQueue",
+    "MemoryJobQueue",
+    "StageGraph",
+    "IdempotentRequests",
+    "Endpointer",
+    "AdmissionDenied",
+    "LLMAdmission",
+    "TokenBucket",
 ]
@@ -0,0 +1,131 @@
+"""Two-tier cache: in-process LRU with TTL, optionally backed by Redis"""
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+def normalize_text(text: str) -> str:
+    """Normalize an utterance for use as a cache key"""
+    text = re.sub(r"[^\w\s]", "", text.lower())
+    return " ".join(text.split())
+
+
+class LRUTTLCache:
+    """In-process LRU cache where every entry expires after a TTL"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a cached value
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None if missing or expired
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value, evicting the least recently used entry if full"""
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class TwoTierCache:
+    """
+    Cache JSON-serializable values in process and, optionally, in Redis
+
+    The local tier answers repeated lookups without any I/O. The Redis tier
+    (through StorageService) shares entries across workers; Redis hits are
+    promoted into the local tier.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        storage=None,
+        maxsize: int = 1024,
+        ttl: int = 3600
+    ):
+        self.namespace = namespace
+        self.storage = storage
+        self.ttl = ttl
+        self.local = LRUTTLCache(maxsize=maxsize, ttl=ttl)
+
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    def make_key(self, text: str) -> str:
+        """Build a cache key from normalized text"""
+        digest = hashlib.sha1(normalize_text(text).encode()).hexdigest()
+        return f"{self.namespace}:{digest}"
+
+    async def get(self, text: str) -> Optional[Any]:
+        """
+        Look up a value by its (un-normalized) text
+
+        Args:
+            text: Text the value was cached under
+
+        Returns:
+            Cached value or None
+        """
+        key = self.make_key(text)
+
+        value = self.local.get(key)
+        if value is not None:
+            self.local_hits += 1
+            return value
+
+        if self.storage:
+            value = await self.storage.get_cached(key)
+            if value is not None:
+                self.redis_hits += 1
+                self.local.set(key, value)
+                return value
+
+        self.misses += 1
+        return None
+
+    async def set(self, text: str, value: Any) -> None:
+        """Store a value in both tiers"""
+        key = self.make_key(text)
+        self.local.set(key, value)
+
+        if self.storage:
+            await self.storage.set_cached(key, value, self.ttl)
+
+    def stats(self) -> dict:
+        """Hit/miss counters for this cache"""
+        lookups = self.local_hits + self.redis_hits + self.misses
+        return {
+            "size": len(self.local),
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.local_hits + self.redis_hits) / lookups, 4) if lookups else 0.0,
+        }
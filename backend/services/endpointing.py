@@ -0,0 +1,189 @@
+"""Utterance endpointing: decide when the user has finished a sentence"""
+import asyncio
+import os
+import re
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+from models.omi_webhook import TranscriptSegment
+from .log import get_logger
+
+logger = get_logger("endpointing")
+
+# Sentence-final punctuation, optionally followed by closing quotes/brackets
+SENTENCE_END = re.compile(r"[.!?][\"')\]]*$")
+# The speaker trailed off or the transcript was cut mid-word ("order a pep…")
+TRAILING_OFF = re.compile(r"(\.\.\.|…|[-–—,:;])$")
+# A word cut off mid-way at the end of a segment ("pep…")
+CUT_WORD = re.compile(r"(\w+)(\.\.\.|…|-)$")
+# An utterance can't end on these ("get me a", "pizza from")
+CONTINUATION_WORDS = {
+    "a", "an", "the", "and", "or", "but", "from", "with", "of", "for", "to", "at",
+    "some", "my", "uh", "um",
+}
+
+
+class Endpointer:
+    """
+    Hold a session's partial speech until the utterance is complete
+
+    The realtime webhook fires while the user is still talking. New user
+    segments are appended to the session's pending segments (a segment Omi
+    re-sends with more text replaces the earlier version), and only
+    completed utterances are released for parsing. A segment ends an
+    utterance when:
+
+    - it ends in sentence-final punctuation, or
+    - the next user segment starts at least `pause_seconds` later, or
+      another speaker started talking after it, or
+    - nothing new has been heard for `pause_seconds` of wall-clock time, or
+    - the utterance has run for `max_utterance_seconds`
+
+    A trailing-off cue (ellipsis, dash, comma, or a word like "from" or
+    "a") holds the utterance unless the pause is three times as long.
+
+    The webhook only fires when there is new speech, so a user who goes
+    quiet after an unpunctuated "order a pad thai" would be held forever.
+    schedule() arms a per-session timer that feeds the session again once
+    the pause has passed.
+    """
+
+    def __init__(self, pause_seconds: Optional[float] = None, max_utterance_seconds: Optional[float] = None):
+        self.pause_seconds = pause_seconds or float(os.getenv("ENDPOINT_PAUSE_SECONDS", 1.0))
+        self.max_utterance_seconds = max_utterance_seconds or float(os.getenv("ENDPOINT_MAX_UTTERANCE_SECONDS", 15))
+        self._timers: Dict[str, asyncio.Task] = {}
+
+    def feed(
+        self,
+        session_context: dict,
+        new_segments: List[TranscriptSegment],
+        segments: List[TranscriptSegment],
+        now: Optional[float] = None
+    ) -> str:
+        """
+        Add new user segments to the session and release completed utterances
+
+        Args:
+            session_context: Session context; "pending" holds partial
+                segments and "heard_at" the wall-clock time new speech last
+                arrived (both updated in place)
+            new_segments: User segments not seen before (empty for a timer flush)
+            segments: Every segment in the payload (other speakers show
+                the user's turn is over)
+            now: Current wall-clock time (defaults to time.time())
+
+        Returns:
+            Text of the completed utterances, or "" if still listening
+        """
+        now = time.time() if now is None else now
+        first_new = min((s.start for s in new_segments), default=float("inf"))
+        pending = [p for p in session_context.get("pending", []) if p["start"] < first_new]
+        pending += [{"text": s.text.strip(), "start": s.start, "end": s.end} for s in new_segments if s.text.strip()]
+        pending.sort(key=lambda p: p["start"])
+        if new_segments:
+            session_context["heard_at"] = now
+
+        completed, current = [], []
+        for i, segment in enumerate(pending):
+            current.append(segment)
+            is_last = i == len(pending) - 1
+
+            if not is_last:
+                gap = pending[i + 1]["start"] - segment["end"]
+            elif any(not s.is_user and s.start >= segment["end"] for s in segments):
+                gap = float("inf")  # someone else took the turn
+            else:
+                # Silence since the last speech arrived (Omi sends nothing while the user is quiet)
+                gap = now - session_context.get("heard_at", now)
+
+            if self._is_end(current, gap):
+                completed.extend(current)
+                current = []
+
+        session_context["pending"] = current
+        return self._join([p["text"] for p in completed])
+
+    def flush_delay(self, session_context: dict, now: Optional[float] = None) -> Optional[float]:
+        """
+        Seconds until held speech is released if nothing new arrives
+
+        Args:
+            session_context: Session context after feed()
+            now: Current wall-clock time (defaults to time.time())
+
+        Returns:
+            Delay in seconds, or None if nothing is held
+        """
+        pending = session_context.get("pending")
+        if not pending:
+            return None
+
+        now = time.time() if now is None else now
+        pause = self.pause_seconds * (3 if self._trails_off(pending[-1]["text"]) else 1)
+        return max(0.0, session_context.get("heard_at", now) + pause - now)
+
+    def schedule(self, session_id: str, delay: float, flush: Callable[[], Awaitable]) -> None:
+        """
+        Run flush() after delay seconds, replacing the session's previous timer
+
+        Args:
+            session_id: Session whose speech is held
+            delay: Seconds to wait (see flush_delay)
+            flush: Coroutine function that feeds the session again
+        """
+        previous = self._timers.pop(session_id, None)
+        if previous:
+            previous.cancel()
+        self._timers[session_id] = asyncio.create_task(self._flush_later(session_id, delay, flush))
+
+    async def _flush_later(self, session_id: str, delay: float, flush: Callable[[], Awaitable]) -> None:
+        try:
+            # A little past the deadline, so the pause has fully elapsed when fed
+            await asyncio.sleep(delay + 0.05)
+            self._timers.pop(session_id, None)
+            await flush()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Error flushing held speech", extra={"session_id": session_id})
+
+    async def stop(self) -> None:
+        """Cancel pending flush timers"""
+        timers, self._timers = list(self._timers.values()), {}
+        for task in timers:
+            task.cancel()
+        await asyncio.gather(*timers, return_exceptions=True)
+
+    @staticmethod
+    def _join(texts: List[str]) -> str:
+        """Join segment texts, dropping a cut-off word the next segment repeats ("a pep…" + "pepperoni")"""
+        joined = []
+        for i, text in enumerate(texts):
+            cut = CUT_WORD.search(text)
+            following = texts[i + 1].lower() if i + 1 < len(texts) else ""
+            if cut and following.startswith(cut.group(1).lower()):
+                text = text[:cut.start()].rstrip()
+            if text:
+                joined.append(text)
+        return " ".join(joined)
+
+    @staticmethod
+    def _ends_sentence(text: str) -> bool:
+        return bool(SENTENCE_END.search(text)) and not TRAILING_OFF.search(text)
+
+    @staticmethod
+    def _trails_off(text: str) -> bool:
+        words = text.lower().split()
+        return bool(TRAILING_OFF.search(text)) or bool(words and words[-1].strip("\"'") in CONTINUATION_WORDS)
+
+    def _is_end(self, utterance: List[dict], gap: float) -> bool:
+        text = utterance[-1]["text"]
+
+        if self._ends_sentence(text):
+            return True
+        if utterance[-1]["end"] - utterance[0]["start"] >= self.max_utterance_seconds:
+            return True
+
+        if self._trails_off(text):
+            return gap >= self.pause_seconds * 3
+
+        return gap >= self.pause_seconds
@@ -0,0 +1,128 @@
+"""Idempotent webhook handling: replay cached responses to retried requests"""
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional
+from .cache import TwoTierCache
+from .log import get_logger
+
+logger = get_logger("idempotency")
+
+
+class IdempotentRequests:
+    """
+    Run each request key once and hand the response to every retry
+
+    Omi retries webhooks that respond slowly. For a given key:
+
+    - a retry that arrives while the first request is still running waits
+      on that same in-flight task instead of recomputing it
+    - a retry that arrives later gets the cached response (local LRU,
+      plus Redis when storage is given) until the TTL expires
+    - with storage, a claim in Redis marks the key as in flight, so a retry
+      landing on another worker polls for the first worker's response
+      instead of starting its own
+
+    Failed requests are not cached, so a retry after an error runs again.
+    """
+
+    def __init__(
+        self,
+        storage=None,
+        ttl: Optional[int] = None,
+        maxsize: Optional[int] = None,
+        wait_timeout: Optional[float] = None
+    ):
+        self.storage = storage
+        self.ttl = ttl or int(os.getenv("IDEMPOTENCY_TTL", 600))
+        self.wait_timeout = wait_timeout or float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", 30))
+        self.responses = TwoTierCache(
+            "idempotency",
+            storage=storage,
+            maxsize=maxsize or int(os.getenv("IDEMPOTENCY_CACHE_SIZE", 2048)),
+            ttl=self.ttl
+        )
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+        self.computed = 0
+        self.joined = 0
+        self.replayed = 0
+        self.in_progress = 0
+
+    async def run(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the response for `key`, computing it at most once
+
+        The computation runs in its own task, so a caller that goes away
+        (e.g. Omi dropped the connection and retried) doesn't cancel it for
+        the callers waiting on it.
+
+        Args:
+            key: Idempotency key (e.g. RealtimeWebhook.idempotency_key())
+            compute: Coroutine function producing a JSON-serializable response
+
+        Returns:
+            The response (re-raises the computation's exception)
+        """
+        task = self._inflight.get(key)
+        if task:
+            self.joined += 1
+        else:
+            task = asyncio.create_task(self._run_once(key, compute))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+
+        return await asyncio.shield(task)
+
+    def _finished(self, key: str, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        # Mark the exception retrieved even if every caller went away
+        if not task.cancelled():
+            task.exception()
+
+    async def _run_once(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        cached = await self.responses.get(key)
+        if cached is not None:
+            self.replayed += 1
+            return cached
+
+        claim = f"idempotency:{key}"
+        if self.storage and not await self.storage.claim_once(claim, int(self.wait_timeout) + 1):
+            return await self._wait_for_other_worker(key)
+
+        try:
+            response = await compute()
+            await self.responses.set(key, response)
+            self.computed += 1
+            return response
+        finally:
+            if self.storage:
+                # The cached response answers retries from here on
+                await self.storage.release_claim(claim)
+
+    async def _wait_for_other_worker(self, key: str) -> Any:
+        """Poll for a response another worker is computing"""
+        cache_key = self.responses.make_key(key)
+        deadline = asyncio.get_running_loop().time() + self.wait_timeout
+
+        while asyncio.get_running_loop().time() < deadline:
+            await asyncio.sleep(0.1)
+            response = await self.storage.get_cached(cache_key)
+            if response is not None:
+                self.replayed += 1
+                self.responses.local.set(cache_key, response)
+                return response
+
+        # Not cached: the other worker is still running (or failed) - don't start a second run
+        self.in_progress += 1
+        logger.warning("Gave up waiting for in-flight request", extra={"key": key})
+        return {"status": "in_progress", "message": "This request is already being processed"}
+
+    def stats(self) -> dict:
+        """Counters for /health and /metrics"""
+        return {
+            "in_flight": len(self._inflight),
+            "computed": self.computed,
+            "joined": self.joined,
+            "replayed": self.replayed,
+            "in_progress": self.in_progress,
+        }
@@ -0,0 +1,130 @@
+"""Fast keyword pre-filter that decides whether a transcript is worth an LLM call"""
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+DEFAULT_VOCABULARY_PATH = Path(__file__).resolve().parent.parent / "data" / "intent_triggers.json"
+
+
+def _trie_regex(phrases) -> str:
+    """
+    Build a regex equivalent to longest-first alternation of phrases
+
+    Shared prefixes are factored into a trie ("order a|order an|order me"
+    becomes roughly "order (?:an?|me)"), so the regex engine tests each
+    character once instead of retrying every phrase at every position.
+    Spaces match any run of whitespace, so input needs no normalizing.
+    """
+    trie: dict = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        ends_here = "" in node
+        branches = [
+            (r"\s+" if char == " " else re.escape(char)) + build(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Greedy "?" tries the longer phrase first and backtracks to the
+        # shorter one if the longer match isn't followed by a word boundary
+        return f"(?:{pattern})?" if ends_here else pattern
+
+    return build(trie)
+
+
+class IntentFilter:
+    """
+    Score a transcript for food-ordering intent with one compiled regex
+
+    Every trigger phrase from the shared vocabulary (data/intent_triggers.json)
+    is folded into one trie-shaped regex that prefers the longest phrase, so
+    one scan finds all matches and "don't order" wins over "order". Each category
+    (strong, weak, restaurant, food, negation) contributes its weight once:
+
+        "order a pizza"     strong + food        = 1.2
+        "i want sushi"      weak + food          = 0.55
+        "order chipotle"    weak + restaurant    = 0.55
+        "in order to"       negation             = -1.0
+
+    The restaurant category is empty in the vocabulary file; callers fill it
+    (and extend food) from the restaurant catalog through `extra_phrases`.
+    """
+
+    def __init__(
+        self,
+        vocabulary_path: Optional[str] = None,
+        threshold: Optional[float] = None,
+        extra_phrases: Optional[Dict[str, Iterable[str]]] = None
+    ):
+        path = vocabulary_path or os.getenv("INTENT_VOCABULARY_PATH") or DEFAULT_VOCABULARY_PATH
+        with open(path) as f:
+            vocabulary = json.load(f)
+
+        self.threshold = threshold if threshold is not None else float(os.getenv("INTENT_SCORE_THRESHOLD", 0.5))
+        self.weights: Dict[str, float] = {}
+        self._category: Dict[str, str] = {}
+
+        for category, entry in vocabulary.items():
+            self.weights[category] = entry["weight"]
+            for phrase in entry["phrases"]:
+                self._category[" ".join(phrase.lower().split())] = category
+
+        # Catalog names and dishes never override a vocabulary phrase ("in order to")
+        for category, phrases in (extra_phrases or {}).items():
+            for phrase in phrases:
+                phrase = " ".join(phrase.lower().split())
+                if phrase:
+                    self._category.setdefault(phrase, category)
+
+        # Lookarounds rather than \b, so phrases that start or end in
+        # punctuation ("dunkin'", "p.f. chang's") still match
+        self._pattern = re.compile(rf"(?<!\w){_trie_regex(self._category)}(?!\w)")
+
+    def phrases(self, category: str) -> list:
+        """All vocabulary phrases in a category (e.g. "food")"""
+        return [phrase for phrase, c in self._category.items() if c == category]
+
+    def matches(self, text: str) -> Dict[str, list]:
+        """
+        Find trigger phrases in text
+
+        Args:
+            text: Transcript text
+
+        Returns:
+            Dict of category -> matched phrases
+        """
+        found: Dict[str, list] = {}
+        for match in self._pattern.findall(text.lower()):
+            phrase = " ".join(match.split())
+            found.setdefault(self._category[phrase], []).append(phrase)
+        return found
+
+    def score(self, text: str) -> float:
+        """
+        Score text for ordering intent
+
+        Args:
+            text: Transcript text
+
+        Returns:
+            Sum of the weights of every category that matched
+        """
+        category = self._category
+        categories = set()
+        for match in self._pattern.findall(text.lower()):
+            categories.add(category.get(match) or category[" ".join(match.split())])
+        return sum(self.weights[c] for c in categories)
+
+    def is_food_intent(self, text: str) -> bool:
+        """True if the text scores at or above the threshold"""
+        return self.score(text) >= self.threshold
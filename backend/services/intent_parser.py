@@ -1,104 +1,316 @@
 """Intent parsing using Claude API"""
+import asyncio
 import json
 import os
-from anthropic import Anthropic
-from typing import Optional
+import time
+from contextlib import asynccontextmanager
+from anthropic import AsyncAnthropic
+from pydantic import ValidationError
+from typing import Any, Callable, Optional
+from models.omi_webhook import Memory
 from models.order import OrderIntent
+from .cache import TwoTierCache
+from .intent_filter import IntentFilter
+from .json_stream import JSONFieldScanner
+from .log import get_logger
+from .metrics import record_llm_call
+from .preferences import chunk_user_segments, merge_preferences
+from .rate_limit import LLMAdmission
+from .rule_parser import RuleBasedParser
+
+logger = get_logger("intent_parser")
+
+MODEL = "claude-sonnet-4-5-20250929"
+
+# Tool Claude must call with the parsed order. Property order matters when
+# streaming: fields the handler acts on early come first.
+ORDER_TOOL = {
+    "name": "record_food_order",
+    "description": "Record the food order parsed from the user's voice command.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "quick_order": {
+                "type": "boolean",
+                "description": 'True if they asked for "my usual", "same as last time" or their "regular order"'
+            },
+            "food_item": {
+                "type": ["string", "null"],
+                "description": 'What specific food they want (e.g. "pepperoni pizza", "burger", "pad thai")'
+            },
+            "restaurant": {
+                "type": ["string", "null"],
+                "description": "Restaurant name if they mentioned one, otherwise null"
+            },
+            "suggested_restaurant": {
+                "type": ["string", "null"],
+                "description": "If no restaurant was mentioned, a highly-rated chain restaurant that serves the food"
+            },
+            "price_tier": {
+                "type": ["string", "null"],
+                "enum": ["$", "$$", "$$$", None],
+                "description": "Typical price tier of the restaurant (mentioned or suggested)"
+            },
+            "cuisine": {
+                "type": ["string", "null"],
+                "description": 'Type of cuisine if mentioned (e.g. "Italian", "Chinese", "Mexican")'
+            },
+            "dietary_restrictions": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": 'Dietary needs (e.g. ["vegetarian"], ["gluten-free"])'
+            },
+            "delivery_instructions": {
+                "type": ["string", "null"],
+                "description": "Any special delivery notes"
+            },
+            "confidence": {
+                "type": "number",
+                "minimum": 0,
+                "maximum": 1,
+                "description": "How confident you are in this parse"
+            }
+        },
+        "required": ["quick_order", "food_item", "restaurant", "dietary_restrictions", "confidence"]
+    }
+}
 
 
 class IntentParser:
-    """Parse food ordering intent from natural language using Claude"""
+    """
+    Parse food ordering intent from natural language using Claude
+
+    Uses the async Anthropic client so an LLM round-trip never blocks the
+    event loop. In-flight Claude calls are capped by a semaphore and each
+    call is bounded by a timeout. Formulaic commands are handled by a
+    rule-based parser, and parsed intents are cached by normalized
+    utterance, so common and repeated commands skip Claude entirely.
+    With an admission controller, order parsing that would need Claude
+    is rate limited per user and shed when too many calls are queued.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        cache: Optional[TwoTierCache] = None,
+        intent_filter: Optional[IntentFilter] = None,
+        rule_parser: Optional[RuleBasedParser] = None,
+        rule_confidence_threshold: Optional[float] = None,
+        admission: Optional[LLMAdmission] = None
+    ):
+        self.max_concurrency = max_concurrency or int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+        self.timeout = timeout or float(os.getenv("LLM_TIMEOUT_SECONDS", 10))
+
+        self.client = AsyncAnthropic(
+            api_key=os.getenv("ANTHROPIC_API_KEY"),
+            timeout=self.timeout
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+        self.admission = admission
+        self.cache = cache or TwoTierCache("intent")
+        self.intent_filter = intent_filter or IntentFilter()
+        self.rule_parser = rule_parser
+        self.rule_confidence_threshold = rule_confidence_threshold or float(
+            os.getenv("RULE_CONFIDENCE_THRESHOLD", 0.85)
+        )
+        self.streaming = os.getenv("INTENT_STREAMING", "true").lower() == "true"
+
+        # Memory transcripts are split into chunks extracted concurrently
+        self.preference_chunk_tokens = int(os.getenv("PREFERENCE_CHUNK_TOKENS", 2000))
+        self.preference_max_chunks = int(os.getenv("PREFERENCE_MAX_CHUNKS", 12))
+        self.preference_concurrency = int(os.getenv("PREFERENCE_CONCURRENCY", 3))
+
+    async def _create_message(self, prompt: str, max_tokens: int = 500) -> str:
+        """
+        Run one Claude completion under the concurrency cap and timeout
+
+        Args:
+            prompt: User prompt
+            max_tokens: Completion token limit
+
+        Returns:
+            Text of the first content block
+        """
+        async with self._llm_slot():
+            response = await self._timed(
+                "preferences",
+                self.client.messages.create(
+                    model=MODEL,
+                    max_tokens=max_tokens,
+                    temperature=0.3,
+                    messages=[{"role": "user", "content": prompt}]
+                )
+            )
+
+        return response.content[0].text
 
-    def __init__(self):
-        self.client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+    @asynccontextmanager
+    async def _llm_slot(self):
+        """Hold one of the max_concurrency Claude slots, counting calls waiting and in flight"""
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    async def _timed(self, purpose: str, call) -> Any:
+        """Await a Claude call with the timeout, recording latency, tokens and outcome"""
+        start = time.perf_counter()
+        response, outcome = None, "error"
+        try:
+            response = await asyncio.wait_for(call, timeout=self.timeout)
+            outcome = "ok"
+            return response
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            raise
+        finally:
+            record_llm_call(MODEL, purpose, time.perf_counter() - start, response, outcome)
 
-    def parse_food_order(self, text: str) -> Optional[OrderIntent]:
+    async def _call_tool(
+        self,
+        prompt: str,
+        tool: dict,
+        on_json: Optional[Callable[[str], None]] = None,
+        max_tokens: int = 500
+    ) -> dict:
+        """
+        Run one Claude completion that must answer by calling `tool`
+
+        Args:
+            prompt: User prompt
+            tool: Tool definition (name, description, input_schema)
+            on_json: If given, the call is streamed and each chunk of the
+                tool input JSON is passed to it as it arrives
+            max_tokens: Completion token limit
+
+        Returns:
+            The tool input, as a dict
+        """
+        request = dict(
+            model=MODEL,
+            max_tokens=max_tokens,
+            temperature=0.3,
+            tools=[tool],
+            tool_choice={"type": "tool", "name": tool["name"]},
+            messages=[{"role": "user", "content": prompt}]
+        )
+
+        async def stream():
+            async with self.client.messages.stream(**request) as events:
+                async for event in events:
+                    if event.type == "content_block_delta" and event.delta.type == "input_json_delta":
+                        on_json(event.delta.partial_json)
+                return await events.get_final_message()
+
+        async with self._llm_slot():
+            response = await self._timed("intent", stream() if on_json else self.client.messages.create(**request))
+
+        return next(block.input for block in response.content if block.type == "tool_use")
+
+    async def parse_food_order(
+        self,
+        text: str,
+        on_field: Optional[Callable[[str, Any], None]] = None,
+        uid: Optional[str] = None
+    ) -> Optional[OrderIntent]:
         """
         Parse food order intent from voice transcript
 
         Args:
             text: User's voice transcript
+            on_field: Called with (field, value) as each field of Claude's
+                JSON streams in, so callers can start downstream work
+                before the response is complete (streaming mode only)
+            uid: User the utterance is from (for per-user rate limiting)
 
         Returns:
             OrderIntent if food order detected, None otherwise
+
+        Raises:
+            AdmissionDenied: Claude was needed but the call was refused
         """
 
         # First check if this is food-related
         if not self._is_food_intent(text):
             return None
 
-        # Parse detailed order information
+        # Common phrasings don't need the LLM
+        if self.rule_parser:
+            intent = self.rule_parser.parse(text)
+            if intent and intent.confidence >= self.rule_confidence_threshold:
+                return intent
+
+        # Identical utterances map to the same parse
+        cached = await self.cache.get(text)
+        if cached is not None:
+            return OrderIntent(**cached["intent"]) if cached["intent"] else None
+
+        if self.admission:
+            await self.admission.admit(uid, self.waiting)
+
+        # Parse the order and pick a restaurant in one structured call
         prompt = f"""
-You are a food ordering assistant. Parse this voice command into structured order data.
+You are a food ordering assistant. Parse this voice command into structured order data
+and record it with the {ORDER_TOOL["name"]} tool.
 
 Voice command: "{text}"
-
-Extract:
-1. food_item: What specific food they want (e.g., "pepperoni pizza", "burger", "pad thai")
-2. restaurant: Specific restaurant name if mentioned (or null)
-3. cuisine: Type of cuisine if mentioned (e.g., "Italian", "Chinese", "Mexican")
-4. dietary_restrictions: List any dietary needs (e.g., ["vegetarian"], ["gluten-free"])
-5. quick_order: true if they said "my usual", "same as last time", "regular order"
-6. delivery_instructions: Any special delivery notes
-7. confidence: 0-1 score of how confident you are in this parse
-
-Return ONLY valid JSON in this exact format:
-{{
-  "food_item": "string or null",
-  "restaurant": "string or null",
-  "cuisine": "string or null",
-  "dietary_restrictions": [],
-  "quick_order": false,
-  "delivery_instructions": "string or null",
-  "confidence": 0.95
-}}
 """
 
         try:
-            response = self.client.messages.create(
-                model="claude-sonnet-4-5-20250929",
-                max_tokens=500,
-                temperature=0.3,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            if on_field and self.streaming:
+                # Hand each field to the caller as soon as its value is complete
+                scanner = JSONFieldScanner()
 
-            # Parse JSON response
-            result = json.loads(response.content[0].text)
-
-            # Convert to OrderIntent model
-            return OrderIntent(
-                food_item=result.get("food_item") or "",
-                restaurant=result.get("restaurant"),
-                cuisine=result.get("cuisine"),
-                dietary_restrictions=result.get("dietary_restrictions", []),
-                quick_order=result.get("quick_order", False),
-                delivery_instructions=result.get("delivery_instructions"),
-                confidence=result.get("confidence", 0.0)
-            )
+                def on_json(chunk: str) -> None:
+                    for field, value in scanner.feed(chunk):
+                        on_field(field, value)
 
-        except Exception as e:
-            print(f"Error parsing intent: {e}")
+                result = await self._call_tool(prompt, ORDER_TOOL, on_json=on_json)
+            else:
+                result = await self._call_tool(prompt, ORDER_TOOL)
+
+            # The tool schema only guides Claude; the API doesn't enforce it, so the
+            # OrderIntent model checks types, the price tier and the confidence range
+            intent = OrderIntent.model_validate({**result, "food_item": result.get("food_item") or ""})
+
+            await self.cache.set(text, {"intent": intent.model_dump()})
+            return intent
+
+        except asyncio.TimeoutError:
+            logger.warning("Intent parsing timed out after %ss", self.timeout)
             return None
 
-    def _is_food_intent(self, text: str) -> bool:
-        """Quick check if text contains food ordering keywords"""
-        text_lower = text.lower()
+        except ValidationError as e:
+            logger.warning("Claude's order didn't match the schema: %s", e.errors(include_url=False))
+            return None
 
-        food_keywords = [
-            "order", "get me", "i want", "food", "hungry",
-            "pizza", "burger", "sushi", "chinese", "italian",
-            "restaurant", "delivery", "doordash", "uber eats",
-            "usual", "lunch", "dinner", "breakfast"
-        ]
+        except Exception as e:
+            logger.error("Error parsing intent: %s", e)
+            return None
 
-        return any(keyword in text_lower for keyword in food_keywords)
+    def _is_food_intent(self, text: str) -> bool:
+        """Quick check if text scores as a food order (gates the LLM call)"""
+        return self.intent_filter.is_food_intent(text)
 
-    def extract_preferences(self, conversation: str) -> dict:
+    async def extract_preferences(self, conversation: str, raise_errors: bool = False) -> dict:
         """
         Extract food preferences from a conversation (for memory trigger)
 
         Args:
             conversation: Full conversation transcript
+            raise_errors: Re-raise timeouts and API/JSON errors instead of
+                returning empty preferences (e.g. so a backfill can retry)
 
         Returns:
             Dict with favorite_cuisines, favorite_restaurants, dietary_preferences
@@ -126,20 +338,58 @@ Return ONLY valid JSON:
 """
 
         try:
-            response = self.client.messages.create(
-                model="claude-sonnet-4-5-20250929",
-                max_tokens=500,
-                temperature=0.3,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            return json.loads(await self._create_message(prompt))
 
-            return json.loads(response.content[0].text)
+        except asyncio.TimeoutError:
+            logger.warning("Preference extraction timed out after %ss", self.timeout)
+            if raise_errors:
+                raise
 
         except Exception as e:
-            print(f"Error extracting preferences: {e}")
-            return {
-                "favorite_cuisines": [],
-                "favorite_restaurants": [],
-                "dietary_preferences": [],
-                "favorite_dishes": []
-            }
+            logger.error("Error extracting preferences: %s", e)
+            if raise_errors:
+                raise
+
+        return {
+            "favorite_cuisines": [],
+            "favorite_restaurants": [],
+            "dietary_preferences": [],
+            "favorite_dishes": []
+        }
+
+    async def extract_memory_preferences(self, memory: Memory, raise_errors: bool = False) -> dict:
+        """
+        Extract food preferences from a memory, map-reduce style
+
+        Only the user's own segments are used. They are split into chunks
+        of about PREFERENCE_CHUNK_TOKENS (at most PREFERENCE_MAX_CHUNKS),
+        extracted concurrently (at most PREFERENCE_CONCURRENCY at a time
+        per memory, so one long recording can't take every LLM slot), and
+        merged in transcript order.
+
+        Args:
+            memory: Memory from the memory-created webhook
+            raise_errors: Fail the whole memory if any chunk fails, rather
+                than merging the chunks that succeeded
+
+        Returns:
+            Dict with favorite_cuisines, favorite_restaurants, dietary_preferences, favorite_dishes
+        """
+        chunks = chunk_user_segments(
+            memory.transcript_segments,
+            self.preference_chunk_tokens,
+            self.preference_max_chunks
+        )
+
+        if not chunks:
+            # Older payloads may only carry the flat transcript
+            chunks = [memory.transcript] if memory.transcript else []
+
+        semaphore = asyncio.Semaphore(self.preference_concurrency)
+
+        async def extract(chunk: str) -> dict:
+            async with semaphore:
+                return await self.extract_preferences(chunk, raise_errors=raise_errors)
+
+        return merge_preferences(await asyncio.gather(*(extract(chunk) for chunk in chunks)))
+
@@ -0,0 +1,91 @@
+"""Incremental scanner for a JSON object arriving in chunks"""
+import json
+from typing import Any, Dict, List, Tuple
+
+_decoder = json.JSONDecoder()
+
+WHITESPACE = " \t\r\n"
+
+
+class JSONFieldScanner:
+    """
+    Pull top-level fields out of a JSON object as it streams in
+
+    feed() takes the next chunk of text and returns every top-level field
+    whose value is now complete, so callers can act on "food_item" while
+    the model is still writing "confidence". Anything before the opening
+    brace (a code fence, a stray sentence) is skipped.
+
+        scanner = JSONFieldScanner()
+        scanner.feed('{"food_item": "pad th')   # []
+        scanner.feed('ai", "restaurant": null') # [("food_item", "pad thai")]
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.fields: Dict[str, Any] = {}
+        self.done = False
+        self._pos = -1  # index after "{" or after the last complete field
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """
+        Add text and return newly completed fields
+
+        Args:
+            chunk: Next piece of streamed text
+
+        Returns:
+            List of (field, value) pairs completed by this chunk
+        """
+        self.buffer += chunk
+        found = []
+
+        if self._pos < 0:
+            start = self.buffer.find("{")
+            if start < 0:
+                return found
+            self._pos = start + 1
+
+        while not self.done:
+            field = self._next_field()
+            if field is None:
+                break
+            self.fields[field[0]] = field[1]
+            found.append(field)
+
+        return found
+
+    def _skip(self, pos: int) -> int:
+        while pos < len(self.buffer) and self.buffer[pos] in WHITESPACE:
+            pos += 1
+        return pos
+
+    def _next_field(self):
+        """Parse one '"key": value' pair at _pos, or None if it isn't complete yet"""
+        buffer = self.buffer
+        pos = self._skip(self._pos)
+
+        if pos < len(buffer) and buffer[pos] == ",":
+            pos = self._skip(pos + 1)
+        if pos >= len(buffer):
+            return None
+        if buffer[pos] == "}":
+            self.done = True
+            return None
+
+        try:
+            key, pos = _decoder.raw_decode(buffer, pos)
+            pos = self._skip(pos)
+            if pos >= len(buffer) or buffer[pos] != ":":
+                return None
+            value, end = _decoder.raw_decode(buffer, self._skip(pos + 1))
+        except json.JSONDecodeError:
+            return None
+
+        # A number is only complete once a delimiter follows it ("0." -> "0.95")
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            if end >= len(buffer) or buffer[end] not in WHITESPACE + ",}":
+                return None
+
+        self._pos = end
+        return key, value
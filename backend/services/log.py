@@ -0,0 +1,129 @@
+"""Structured JSON logging written by a background thread"""
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import uuid
+from typing import Optional
+
+# Request id for every log line emitted while handling a request
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
+# LogRecord attributes that aren't user-supplied `extra` fields
+_STANDARD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+_records: queue.SimpleQueue = queue.SimpleQueue()
+_listener: Optional[logging.handlers.QueueListener] = None
+_debug_sample_rate = 0.01
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, request_id and any extra fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS:
+                entry[key] = value
+
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves formatting to the writer thread
+
+    The stock handler formats the message on the calling thread; this one
+    only stamps the request id (context variables don't cross threads) and
+    enqueues the record, so `%s` arguments are rendered off the request
+    path. Arguments should therefore not be mutated after logging.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.request_id = request_id_var.get()
+        return record
+
+
+def setup_logging(level: Optional[str] = None, debug_sample_rate: Optional[float] = None) -> None:
+    """
+    Route the "foodvoice" loggers through a queue to a JSON writer thread
+
+    Safe to call more than once (e.g. on every app startup); the writer
+    thread is restarted if shutdown_logging() stopped it.
+
+    Args:
+        level: Minimum level (defaults to LOG_LEVEL or INFO)
+        debug_sample_rate: Fraction of debug_sampled() dumps to keep
+            (defaults to LOG_DEBUG_SAMPLE_RATE or 0.01)
+    """
+    global _listener, _debug_sample_rate
+
+    logger = logging.getLogger("foodvoice")
+    logger.setLevel((level or os.getenv("LOG_LEVEL", "INFO")).upper())
+    _debug_sample_rate = debug_sample_rate if debug_sample_rate is not None else float(
+        os.getenv("LOG_DEBUG_SAMPLE_RATE", 0.01)
+    )
+
+    if not any(isinstance(handler, _LazyQueueHandler) for handler in logger.handlers):
+        logger.addHandler(_LazyQueueHandler(_records))
+        logger.propagate = False
+
+    if not _listener:
+        writer = logging.StreamHandler(sys.stdout)
+        writer.setFormatter(JSONFormatter())
+        _listener = logging.handlers.QueueListener(_records, writer)
+        _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener:
+        _listener.stop()
+        _listener = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger under the "foodvoice" hierarchy (e.g. get_logger("storage"))"""
+    return logging.getLogger(f"foodvoice.{name}")
+
+
+def new_request_id() -> str:
+    """Set and return a fresh request id for the current context"""
+    request_id = uuid.uuid4().hex[:16]
+    request_id_var.set(request_id)
+    return request_id
+
+
+def debug_sampled(logger: logging.Logger, msg: str, *args, **fields) -> None:
+    """
+    Debug-level payload dump, kept for only a sample of calls
+
+    Large payloads (raw transcripts, model output) are useful when
+    debugging but too expensive to log on every request. Nothing is
+    formatted unless debug is enabled and the call is sampled.
+
+    Args:
+        logger: Logger to write to
+        msg: Message (with %-style placeholders)
+        *args: Message arguments
+        **fields: Extra structured fields
+    """
+    if logger.isEnabledFor(logging.DEBUG) and random.random() < _debug_sample_rate:
+        logger.debug(msg, *args, extra={"sampled": True, "sample_rate": _debug_sample_rate, **fields})
+
@@ -0,0 +1,147 @@
+"""Background processing of memory-created webhooks"""
+import asyncio
+import os
+import random
+from typing import Optional
+from models.omi_webhook import MemoryCreated
+from .metrics import STAGE_SECONDS
+from .work_queue import WorkQueue
+from .log import get_logger
+
+logger = get_logger("memory_jobs")
+
+
+class MemoryJobQueue:
+    """
+    Extract preferences from new memories off the request path
+
+    The memory webhook only enqueues the payload. Workers run the
+    preference extraction, profile update and notification. Memories are
+    sharded by uid, so one user's updates apply in order, and deduplicated
+    by memory id, so Omi's retries don't repeat the work. The parser
+    passed in should have its own LLM concurrency cap so this offline work
+    can't crowd out the realtime path.
+
+    A failed extraction or profile write is retried with exponential
+    backoff. After the last attempt the memory is dead-lettered and its
+    dedup claim released, so a later retry from Omi is processed instead
+    of being dropped as a duplicate.
+    """
+
+    def __init__(
+        self,
+        intent_parser,
+        storage,
+        notification_service,
+        workers: Optional[int] = None,
+        dedup_ttl: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        base_delay: Optional[float] = None
+    ):
+        self.intent_parser = intent_parser
+        self.storage = storage
+        self.notification_service = notification_service
+        self.dedup_ttl = dedup_ttl or int(os.getenv("MEMORY_DEDUP_TTL", 86400))
+        self.max_attempts = max_attempts or int(os.getenv("MEMORY_MAX_ATTEMPTS", 3))
+        self.base_delay = base_delay if base_delay is not None else float(os.getenv("MEMORY_RETRY_BASE_DELAY", 2))
+
+        self.queue = WorkQueue(
+            "memory_jobs",
+            self._process,
+            storage=storage,
+            shards=workers or int(os.getenv("MEMORY_WORKERS", 2))
+        )
+
+        self.duplicates = 0
+        self.enqueue_failed = 0
+        self.retries = 0
+        self.failed = 0
+
+    async def enqueue(self, webhook: MemoryCreated) -> str:
+        """
+        Queue a memory for preference extraction
+
+        Args:
+            webhook: Memory-created payload
+
+        Returns:
+            "accepted" if queued, "duplicate" if this memory was already
+            claimed, or "unavailable" if the queue refused it (the claim is
+            released so Omi's retry can queue it)
+        """
+        claim = f"memory:{webhook.memory.id}"
+        if not await self.storage.claim_once(claim, self.dedup_ttl):
+            self.duplicates += 1
+            return "duplicate"
+
+        if not await self.queue.put(webhook.uid, webhook.model_dump()):
+            self.enqueue_failed += 1
+            await self.storage.release_claim(claim)
+            return "unavailable"
+
+        return "accepted"
+
+    def start(self) -> None:
+        """Start the workers"""
+        self.queue.start()
+
+    async def stop(self) -> None:
+        """Stop the workers (unprocessed memories stay queued in Redis)"""
+        await self.queue.stop()
+
+    async def _process(self, item: dict) -> None:
+        webhook = MemoryCreated.model_validate(item)
+        logger.info("Processing memory", extra={"memory_id": webhook.memory.id, "uid": webhook.uid})
+
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                await self._apply(webhook)
+                return
+            except Exception:
+                logger.warning(
+                    "Memory attempt %d/%d failed", attempt, self.max_attempts,
+                    extra={"memory_id": webhook.memory.id}, exc_info=True
+                )
+
+            if attempt < self.max_attempts:
+                self.retries += 1
+                await asyncio.sleep(self.base_delay * 2 ** (attempt - 1) * random.uniform(0.5, 1.0))
+
+        self.failed += 1
+        logger.error("Giving up on memory after %d attempts", self.max_attempts, extra={"memory_id": webhook.memory.id})
+        await self.storage.release_claim(f"memory:{webhook.memory.id}")
+        await self.queue.dead_letter(item)
+
+    async def _apply(self, webhook: MemoryCreated) -> None:
+        """Extract and save one memory's preferences (raises if either step fails)"""
+        # Extract food preferences from the user's side of the conversation
+        with STAGE_SECONDS.time(handler="memory", stage="extract"):
+            preferences = await self.intent_parser.extract_memory_preferences(webhook.memory, raise_errors=True)
+        logger.info("Extracted preferences", extra={"memory_id": webhook.memory.id, "preferences": preferences})
+
+        if not any(preferences.values()):
+            return
+
+        with STAGE_SECONDS.time(handler="memory", stage="save"):
+            if not await self.storage.update_preferences(webhook.uid, preferences):
+                raise RuntimeError("Profile write failed")
+
+        # Send notification about learned preferences
+        if preferences.get("favorite_restaurants"):
+            restaurants = ", ".join(preferences["favorite_restaurants"][:3])
+            with STAGE_SECONDS.time(handler="memory", stage="notify"):
+                await self.notification_service.send_notification(
+                    webhook.uid,
+                    f"I learned you like: {restaurants}! I'll remember that for next time."
+                )
+
+    async def stats(self) -> dict:
+        """Queue depth and counters"""
+        return {
+            "queued": await self.queue.depth(),
+            "processed": self.queue.processed,
+            "duplicates": self.duplicates,
+            "enqueue_failed": self.enqueue_failed,
+            "retries": self.retries,
+            "failed": self.failed,
+        }
@@ -0,0 +1,181 @@
+"""Minimal Prometheus-format metrics (counters and histograms)"""
+import bisect
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def format_metric(name: str, kind: str, help_text: str, samples: Iterable[Tuple[dict, float]]) -> str:
+    """
+    Render one metric family in the Prometheus text format
+
+    Args:
+        name: Metric name
+        kind: "counter", "gauge", "histogram" or "untyped"
+        help_text: HELP line
+        samples: (labels dict, value) pairs
+
+    Returns:
+        Exposition text ending in a newline
+    """
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(tuple(labels), tuple(labels.values()))} {value}")
+    return "\n".join(lines) + "\n"
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    def __init__(self, name: str, help_text: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(labels.get(name, "") for name in self.label_names)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.label_names, key)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class Histogram:
+    """
+    Histogram with fixed buckets and optional labels
+
+    observe() is a bisect and three increments; cumulative bucket counts
+    are only computed when rendering.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple, List] = {}  # key -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(labels.get(name, "") for name in self.label_names)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [0] * (len(self.buckets) + 2)
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of a with-block, in seconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series[:-1]):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {series[-1]}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+class Registry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "".join(metric.render() for metric in self._metrics)
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "foodvoice_stage_seconds",
+    "Time spent in each stage of a webhook handler",
+    labels=("handler", "stage")
+))
+
+LLM_CALLS = REGISTRY.register(Counter(
+    "foodvoice_llm_calls_total",
+    "Claude API calls by model, purpose and outcome",
+    labels=("model", "purpose", "outcome")
+))
+
+LLM_TOKENS = REGISTRY.register(Counter(
+    "foodvoice_llm_tokens_total",
+    "Claude tokens used by model and direction (input/output)",
+    labels=("model", "direction")
+))
+
+LLM_SECONDS = REGISTRY.register(Histogram(
+    "foodvoice_llm_seconds",
+    "Claude API call latency",
+    labels=("model", "purpose")
+))
+
+OMI_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "foodvoice_omi_request_seconds",
+    "Omi notification API latency by outcome",
+    labels=("outcome",)
+))
+
+
+def record_llm_call(
+    model: str,
+    purpose: str,
+    seconds: float,
+    response=None,
+    outcome: Optional[str] = None
+) -> None:
+    """
+    Record one Claude call
+
+    Args:
+        model: Model name
+        purpose: What the call was for ("intent", "preferences", "suggestion")
+        seconds: Call latency
+        response: API response (for token usage), if the call succeeded
+        outcome: "ok", "timeout" or "error" (defaults to "ok")
+    """
+    LLM_CALLS.inc(model=model, purpose=purpose, outcome=outcome or "ok")
+    LLM_SECONDS.observe(seconds, model=model, purpose=purpose)
+
+    usage = getattr(response, "usage", None)
+    if usage:
+        LLM_TOKENS.inc(usage.input_tokens, model=model, direction="input")
+        LLM_TOKENS.inc(usage.output_tokens, model=model, direction="output")
@@ -0,0 +1,97 @@
+"""Outbox for Omi notifications, delivered by background workers"""
+import asyncio
+import os
+import random
+import time
+from typing import Optional
+from .work_queue import WorkQueue
+from .log import get_logger
+
+logger = get_logger("notification_outbox")
+
+
+class NotificationOutbox:
+    """
+    Queue notifications and deliver them off the request path
+
+    Webhooks only pay for an enqueue. Workers deliver through
+    OmiNotificationService.deliver, retrying failures with exponential
+    backoff. Notifications for one uid are delivered in order; ones that
+    still fail after the last attempt are dead-lettered.
+    """
+
+    def __init__(
+        self,
+        notification_service,
+        storage=None,
+        workers: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        base_delay: Optional[float] = None,
+        max_delay: Optional[float] = None
+    ):
+        self.notification_service = notification_service
+        self.max_attempts = max_attempts or int(os.getenv("NOTIFY_MAX_ATTEMPTS", 5))
+        self.base_delay = base_delay or float(os.getenv("NOTIFY_RETRY_BASE_DELAY", 0.5))
+        self.max_delay = max_delay or float(os.getenv("NOTIFY_RETRY_MAX_DELAY", 8))
+
+        self.queue = WorkQueue(
+            "notification_outbox",
+            self._deliver,
+            storage=storage,
+            shards=workers or int(os.getenv("NOTIFY_WORKERS", 4))
+        )
+
+        self.delivered = 0
+        self.retries = 0
+        self.failed = 0
+
+    async def enqueue(self, uid: str, message: str, title: Optional[str] = None) -> bool:
+        """
+        Queue a notification for delivery
+
+        Args:
+            uid: User ID
+            message: Notification message
+            title: Optional title
+
+        Returns:
+            True if queued
+        """
+        return await self.queue.put(uid, {
+            "uid": uid,
+            "message": message,
+            "title": title,
+            "enqueued_at": time.time()
+        })
+
+    def start(self) -> None:
+        """Start the delivery workers"""
+        self.queue.start()
+
+    async def stop(self) -> None:
+        """Stop the delivery workers (undelivered items stay queued in Redis)"""
+        await self.queue.stop()
+
+    async def _deliver(self, item: dict) -> None:
+        for attempt in range(1, self.max_attempts + 1):
+            if await self.notification_service.deliver(item["uid"], item["message"], item.get("title")):
+                self.delivered += 1
+                return
+
+            if attempt < self.max_attempts:
+                self.retries += 1
+                delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+
+        self.failed += 1
+        logger.warning("Giving up on notification after %d attempts", self.max_attempts, extra={"uid": item["uid"]})
+        await self.queue.dead_letter(item)
+
+    async def stats(self) -> dict:
+        """Queue depth and delivery counters"""
+        return {
+            "queued": await self.queue.depth(),
+            "delivered": self.delivered,
+            "retries": self.retries,
+            "failed": self.failed,
+        }
@@ -1,16 +1,59 @@
 """Send notifications back to Omi device"""
 import os
+import time
 import httpx
 from typing import Optional
+from .metrics import OMI_REQUEST_SECONDS
+from .log import get_logger
+
+logger = get_logger("omi_notifications")
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """
+    Build the long-lived HTTP client for Omi API calls
+
+    Keep-alive pooling means notifications after the first reuse an open
+    TLS connection. HTTP/2 is used when OMI_HTTP2=true and the h2 package
+    is installed (pip install "httpx[http2]").
+    """
+    http2 = os.getenv("OMI_HTTP2", "false").lower() == "true"
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("OMI_HTTP2 set but h2 is not installed - using HTTP/1.1")
+            http2 = False
+
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=int(os.getenv("OMI_HTTP_MAX_CONNECTIONS", 20)),
+            max_keepalive_connections=int(os.getenv("OMI_HTTP_MAX_KEEPALIVE", 10)),
+            keepalive_expiry=30.0
+        ),
+        timeout=httpx.Timeout(
+            connect=float(os.getenv("OMI_HTTP_CONNECT_TIMEOUT", 3)),
+            read=float(os.getenv("OMI_HTTP_READ_TIMEOUT", 5)),
+            write=5.0,
+            pool=5.0
+        )
+    )
 
 
 class OmiNotificationService:
     """Send notifications to Omi device"""
 
-    def __init__(self):
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
         self.api_key = os.getenv("OMI_API_KEY")
         self.app_id = os.getenv("OMI_APP_ID")
         self.base_url = "https://api.omi.me"  # Update with actual Omi API base URL
+        self.client = client or create_http_client()
+        self.outbox = None  # set to a NotificationOutbox to deliver in the background
+
+    async def close(self) -> None:
+        """Close the pooled HTTP client (call once on shutdown)"""
+        await self.client.aclose()
 
     async def send_notification(
         self,
@@ -21,6 +64,31 @@ class OmiNotificationService:
         """
         Send push notification to user's Omi device
 
+        With an outbox attached this only queues the notification; the
+        outbox workers call deliver().
+
+        Args:
+            uid: User ID
+            message: Notification message
+            title: Optional title
+
+        Returns:
+            True if successful (or queued)
+        """
+        if self.outbox:
+            return await self.outbox.enqueue(uid, message, title)
+
+        return await self.deliver(uid, message, title)
+
+    async def deliver(
+        self,
+        uid: str,
+        message: str,
+        title: Optional[str] = None
+    ) -> bool:
+        """
+        Post a notification to the Omi API right away
+
         Args:
             uid: User ID
             message: Notification message
@@ -34,28 +102,31 @@ class OmiNotificationService:
         # This is a placeholder - check Omi docs for actual API
 
         if not self.api_key or not self.app_id:
-            print(f"📱 [DEMO MODE] Would send notification: {message}")
+            logger.info("[DEMO MODE] Would send notification", extra={"uid": uid, "notification": message})
             return True
 
+        start = time.perf_counter()
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/notifications",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "X-App-ID": self.app_id
-                    },
-                    json={
-                        "uid": uid,
-                        "title": title or "Food Order",
-                        "message": message
-                    }
-                )
-
-                return response.status_code == 200
+            response = await self.client.post(
+                f"{self.base_url}/notifications",
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "X-App-ID": self.app_id
+                },
+                json={
+                    "uid": uid,
+                    "title": title or "Food Order",
+                    "message": message
+                }
+            )
+
+            ok = response.status_code == 200
+            OMI_REQUEST_SECONDS.observe(time.perf_counter() - start, outcome="ok" if ok else f"http_{response.status_code}")
+            return ok
 
         except Exception as e:
-            print(f"Error sending notification: {e}")
+            OMI_REQUEST_SECONDS.observe(time.perf_counter() - start, outcome="error")
+            logger.error("Error sending notification: %s", e)
             return False
 
     async def send_order_confirmation(
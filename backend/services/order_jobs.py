@@ -0,0 +1,225 @@
+"""Background order placement jobs"""
+import asyncio
+import os
+import uuid
+from datetime import datetime
+from typing import Optional, Tuple
+from models.order import OrderIntent, OrderResult, OrderJob
+from .log import get_logger
+
+logger = get_logger("order_jobs")
+
+
+class OrderJobQueue:
+    """
+    Place orders in the background instead of inside the webhook
+
+    submit() returns a job id and the deep link straight away; a bounded
+    pool of workers then runs OrderService.place_order (MultiOn browser
+    automation) with a per-job timeout. Job status is kept in storage so
+    any worker can answer GET /orders/{job_id}.
+
+    The queue itself is in process and not durable. With Redis, every
+    unfinished job is recorded against its process, which keeps an owner
+    key alive while it runs; each process periodically marks jobs whose
+    owner is gone (crashed or restarted) as failed, so they don't stay
+    "queued" forever. Their deep link still works.
+    """
+
+    OPEN_JOBS_KEY = "order_jobs:open"  # hash: job_id -> owner
+    OWNER_TTL = 30
+
+    def __init__(
+        self,
+        order_service,
+        storage,
+        notification_service=None,
+        workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_pending: Optional[int] = None
+    ):
+        self.order_service = order_service
+        self.storage = storage
+        self.notification_service = notification_service
+        self.workers = workers or int(os.getenv("ORDER_WORKERS", 2))
+        self.timeout = timeout or float(os.getenv("ORDER_JOB_TIMEOUT_SECONDS", 120))
+
+        self.owner = uuid.uuid4().hex
+
+        self._queue = asyncio.Queue(maxsize=max_pending or int(os.getenv("ORDER_MAX_PENDING", 100)))
+        self._tasks = []
+
+    @property
+    def _redis(self):
+        return self.storage.redis_client if self.storage else None
+
+    def _owner_key(self, owner: str) -> str:
+        return f"order_jobs:owner:{owner}"
+
+    async def submit(self, uid: str, order: OrderIntent) -> Tuple[str, OrderResult]:
+        """
+        Submit an order for placement
+
+        Args:
+            uid: User ID
+            order: OrderIntent to place
+
+        Returns:
+            (job_id, provisional OrderResult with a deep link)
+        """
+        provisional = self.order_service.generate_deeplink(order)
+        now = datetime.now()
+
+        job = OrderJob(
+            job_id=uuid.uuid4().hex,
+            uid=uid,
+            status="queued",
+            order=order,
+            result=provisional,
+            created_at=now,
+            updated_at=now
+        )
+
+        if not self.order_service.has_automation:
+            # Nothing to automate - the deep link is the final result
+            job.status = "completed"
+        else:
+            try:
+                self._queue.put_nowait(job.job_id)
+            except asyncio.QueueFull:
+                logger.warning("Order queue full - falling back to deep link")
+                job.status = "completed"
+
+        await self.storage.save_order_job(job)
+        if job.status == "queued":
+            await self._track(job.job_id)
+        return job.job_id, provisional
+
+    async def get(self, job_id: str) -> Optional[OrderJob]:
+        """Get the current state of a job"""
+        return await self.storage.get_order_job(job_id)
+
+    def start(self) -> None:
+        """Start the worker pool (and, with Redis, the orphaned-job sweep)"""
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        if self._redis:
+            self._tasks.append(asyncio.create_task(self._heartbeat()))
+
+    async def stop(self) -> None:
+        """Stop the worker pool; unfinished jobs are failed by the next sweep"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        if self._redis:
+            try:
+                await self._redis.delete(self._owner_key(self.owner))
+            except Exception as e:
+                logger.error("Error releasing order job owner key: %s", e)
+
+    def pending(self) -> int:
+        """Number of jobs waiting for a worker"""
+        return self._queue.qsize()
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception:
+                logger.exception("Error running order job %s", job_id)
+            finally:
+                await self._untrack(job_id)
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        job = await self.storage.get_order_job(job_id)
+        if not job:
+            return
+
+        job.status = "running"
+        job.updated_at = datetime.now()
+        await self.storage.save_order_job(job)
+
+        try:
+            # MultiOn is synchronous; a timed-out thread is abandoned, not killed
+            job.result = await asyncio.wait_for(
+                asyncio.to_thread(self.order_service.place_order, job.order),
+                timeout=self.timeout
+            )
+            job.status = "completed"
+
+        except asyncio.TimeoutError:
+            logger.warning("Order job %s timed out after %ss", job_id, self.timeout)
+            job.status = "timed_out"
+
+        except Exception as e:
+            logger.error("Error placing order for job %s: %s", job_id, e)
+            job.status = "failed"
+
+        job.updated_at = datetime.now()
+        await self.storage.save_order_job(job)
+
+        if job.status == "completed" and job.result.status == "success" and self.notification_service:
+            await self.notification_service.send_notification(
+                job.uid,
+                f"🛒 Your order from {job.result.restaurant} is ready at checkout.",
+                title="Order Ready"
+            )
+
+    async def _track(self, job_id: str) -> None:
+        """Record a queued job against this process"""
+        if not self._redis:
+            return
+        try:
+            await self._redis.hset(self.OPEN_JOBS_KEY, job_id, self.owner)
+        except Exception as e:
+            logger.error("Error tracking order job %s: %s", job_id, e)
+
+    async def _untrack(self, job_id: str) -> None:
+        if not self._redis:
+            return
+        try:
+            await self._redis.hdel(self.OPEN_JOBS_KEY, job_id)
+        except Exception as e:
+            logger.error("Error untracking order job %s: %s", job_id, e)
+
+    async def _heartbeat(self) -> None:
+        """Keep this process's owner key alive and fail other owners' orphaned jobs"""
+        while True:
+            try:
+                await self._redis.set(self._owner_key(self.owner), 1, ex=self.OWNER_TTL)
+                await self.fail_orphaned_jobs()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Error in order job heartbeat: %s", e)
+            await asyncio.sleep(self.OWNER_TTL / 3)
+
+    async def fail_orphaned_jobs(self) -> int:
+        """
+        Mark unfinished jobs whose process is gone as failed
+
+        Returns:
+            Number of jobs marked failed
+        """
+        open_jobs = await self._redis.hgetall(self.OPEN_JOBS_KEY)
+        owners = {owner for owner in open_jobs.values() if owner != self.owner}
+        alive = {owner for owner in owners if await self._redis.exists(self._owner_key(owner))}
+
+        failed = 0
+        for job_id, owner in open_jobs.items():
+            if owner == self.owner or owner in alive:
+                continue
+
+            job = await self.storage.get_order_job(job_id)
+            if job and job.status in ("queued", "running"):
+                logger.warning("Order job %s was lost with its worker (%s)", job_id, job.status)
+                job.status = "failed"
+                job.updated_at = datetime.now()
+                await self.storage.save_order_job(job)
+                failed += 1
+            await self._redis.hdel(self.OPEN_JOBS_KEY, job_id)
+
+        return failed
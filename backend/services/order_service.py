@@ -2,6 +2,10 @@
 import os
 from typing import Optional
 from models.order import OrderIntent, OrderResult
+from .restaurant_catalog import slugify
+from .log import get_logger
+
+logger = get_logger("order_service")
 
 
 class OrderService:
@@ -10,6 +14,11 @@ class OrderService:
     def __init__(self):
         self.multion_key = os.getenv("MULTION_API_KEY")
 
+    @property
+    def has_automation(self) -> bool:
+        """True if orders can be placed by browser automation"""
+        return bool(self.multion_key)
+
     def place_order(self, order: OrderIntent) -> OrderResult:
         """
         Place food order using best available method
@@ -32,7 +41,7 @@ class OrderService:
                 return result
 
         # Fallback to deep link
-        return self._generate_deeplink(order)
+        return self.generate_deeplink(order)
 
     def _place_order_multion(self, order: OrderIntent) -> OrderResult:
         """
@@ -78,12 +87,12 @@ class OrderService:
                 )
 
         except Exception as e:
-            print(f"MultiOn error: {e}")
+            logger.error("MultiOn error: %s", e)
 
         # If MultiOn fails, fallback to deep link
-        return self._generate_deeplink(order)
+        return self.generate_deeplink(order)
 
-    def _generate_deeplink(self, order: OrderIntent) -> OrderResult:
+    def generate_deeplink(self, order: OrderIntent) -> OrderResult:
         """
         Generate DoorDash deep link for manual ordering
 
@@ -99,7 +108,7 @@ class OrderService:
 
         if order.restaurant:
             # Search for specific restaurant
-            restaurant_slug = order.restaurant.lower().replace(" ", "-")
+            restaurant_slug = order.restaurant_slug or slugify(order.restaurant)
             search_url = f"{base_url}/store/{restaurant_slug}/"
 
             # Try to add item to search
@@ -0,0 +1,77 @@
+"""Dependency-ordered async stages with per-stage timings"""
+import asyncio
+import inspect
+import time
+from typing import Any, Callable, Dict, Iterable
+
+
+class StageGraph:
+    """
+    Run named stages concurrently, each as soon as its dependencies finish
+
+    Every stage starts as a task the moment it is added; it first waits on
+    the stages it depends on, then calls its function with their results.
+    Stages that don't depend on each other therefore overlap:
+
+        graph = StageGraph()
+        graph.add("session", load_session)
+        graph.add("profile", load_profile, after=["session"])
+        graph.add("intent", parse_intent, after=["session"])  # runs alongside "profile"
+        intent = await graph.result("intent")
+
+    timings holds each finished stage's own run time in milliseconds (not
+    counting the wait on its dependencies).
+    """
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def add(self, name: str, fn: Callable, after: Iterable[str] = ()) -> asyncio.Task:
+        """
+        Add a stage
+
+        Args:
+            name: Stage name (unique within the graph)
+            fn: Sync or async function called with the results of `after`, in order
+            after: Names of stages this one depends on
+
+        Returns:
+            The stage's task
+        """
+        if name in self._tasks:
+            raise ValueError(f"Stage {name!r} already added")
+
+        dependencies = [self._tasks[dependency] for dependency in after]
+
+        async def run() -> Any:
+            args = [await dependency for dependency in dependencies]
+            start = time.perf_counter()
+            try:
+                result = fn(*args)
+                if inspect.isawaitable(result):
+                    result = await result
+                return result
+            finally:
+                self.timings[name] = round((time.perf_counter() - start) * 1000, 2)
+
+        task = asyncio.create_task(run())
+        self._tasks[name] = task
+        return task
+
+    async def result(self, name: str) -> Any:
+        """Wait for a stage and return its result (re-raises its exception)"""
+        return await self._tasks[name]
+
+    async def cancel(self, keep: Iterable[str] = ()) -> None:
+        """
+        Cancel every stage that hasn't finished
+
+        Args:
+            keep: Stages to let finish instead (e.g. writes)
+        """
+        keep = [self._tasks[name] for name in keep if name in self._tasks]
+        pending = [task for task in self._tasks.values() if not task.done() and task not in keep]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*keep, *pending, return_exceptions=True)
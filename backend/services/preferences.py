@@ -0,0 +1,78 @@
+"""Chunking and merging for map-reduce preference extraction"""
+from typing import Dict, Iterable, List
+from models.omi_webhook import TranscriptSegment
+
+PREFERENCE_KEYS = ["favorite_cuisines", "favorite_restaurants", "dietary_preferences", "favorite_dishes"]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English)"""
+    return len(text) // 4 + 1
+
+
+def chunk_user_segments(
+    segments: Iterable[TranscriptSegment],
+    token_budget: int,
+    max_chunks: int
+) -> List[str]:
+    """
+    Group the user's segments into transcript chunks of about token_budget tokens
+
+    Segments are never split. If the user spoke for so long that the chunks
+    would exceed max_chunks, the budget grows so there are at most
+    max_chunks chunks.
+
+    Args:
+        segments: Memory transcript segments (other speakers are skipped)
+        token_budget: Target tokens per chunk
+        max_chunks: Upper bound on the number of chunks
+
+    Returns:
+        List of chunk texts, one segment per line
+    """
+    lines = [s.text.strip() for s in segments if s.is_user and s.text.strip()]
+    total = sum(estimate_tokens(line) for line in lines)
+    budget = max(token_budget, -(-total // max_chunks))
+
+    chunks, current, size = [], [], 0
+    for line in lines:
+        tokens = estimate_tokens(line)
+        if current and size + tokens > budget:
+            chunks.append("\n".join(current))
+            current, size = [], 0
+        current.append(line)
+        size += tokens
+
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def merge_preferences(partials: Iterable[dict]) -> Dict[str, List[str]]:
+    """
+    Merge per-chunk preferences into one set
+
+    Values keep the order they were first seen in (chunks in transcript
+    order), and duplicates are dropped case-insensitively, keeping the
+    first spelling, so the same transcript always merges the same way.
+
+    Args:
+        partials: Preference dicts, in chunk order
+
+    Returns:
+        Dict with every key in PREFERENCE_KEYS
+    """
+    merged: Dict[str, List[str]] = {key: [] for key in PREFERENCE_KEYS}
+    seen = {key: set() for key in PREFERENCE_KEYS}
+
+    for partial in partials:
+        for key in PREFERENCE_KEYS:
+            for value in partial.get(key) or []:
+                if not isinstance(value, str) or not value.strip():
+                    continue
+                folded = value.strip().casefold()
+                if folded not in seen[key]:
+                    seen[key].add(folded)
+                    merged[key].append(value.strip())
+
+    return merged
@@ -0,0 +1,131 @@
+"""Token-bucket rate limiting and admission control for LLM calls"""
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+from .log import get_logger
+
+logger = get_logger("rate_limit")
+
+
+class AdmissionDenied(Exception):
+    """An LLM call was refused; reason is "rate_limited" (per user) or "overloaded" (global)"""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class TokenBucket:
+    """In-process token bucket: `rate` tokens per second, holding at most `burst`"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self) -> bool:
+        """Take one token if available"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class LLMAdmission:
+    """
+    Decide whether a request may make a Claude call
+
+    Checked right before the call (after the keyword filter, rule parser
+    and cache have had their chance), in this order:
+
+    1. Load shedding: if LLM_MAX_QUEUE calls are already waiting for a
+       concurrency slot, the request is refused as "overloaded" rather
+       than queued behind them
+    2. Per-uid bucket (LLM_USER_RATE_PER_MINUTE, LLM_USER_BURST), so one
+       chatty device can't use everyone's budget: "rate_limited"
+    3. Global bucket (LLM_GLOBAL_RATE_PER_SECOND, LLM_GLOBAL_BURST):
+       "overloaded"
+
+    Buckets live in process, or in Redis (through StorageService) when
+    shared=True so every worker draws from the same budget.
+    """
+
+    def __init__(
+        self,
+        storage=None,
+        shared: Optional[bool] = None,
+        user_rate_per_minute: Optional[float] = None,
+        user_burst: Optional[int] = None,
+        global_rate_per_second: Optional[float] = None,
+        global_burst: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        max_users: int = 10000
+    ):
+        self.storage = storage
+        self.shared = shared if shared is not None else os.getenv("RATE_LIMIT_REDIS", "false").lower() == "true"
+        self.user_rate = (user_rate_per_minute or float(os.getenv("LLM_USER_RATE_PER_MINUTE", 6))) / 60
+        self.user_burst = user_burst or int(os.getenv("LLM_USER_BURST", 3))
+        self.global_rate = global_rate_per_second or float(os.getenv("LLM_GLOBAL_RATE_PER_SECOND", 10))
+        self.global_burst = global_burst or int(os.getenv("LLM_GLOBAL_BURST", 20))
+        self.max_queue = max_queue or int(os.getenv("LLM_MAX_QUEUE", 16))
+        self.max_users = max_users
+
+        self._global = TokenBucket(self.global_rate, self.global_burst)
+        self._users: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+        self.admitted = 0
+        self.rate_limited = 0
+        self.shed = 0
+
+    async def admit(self, uid: Optional[str], queued: int) -> None:
+        """
+        Admit one LLM call or raise AdmissionDenied
+
+        Args:
+            uid: User the call is for (None skips the per-user bucket)
+            queued: Calls currently waiting for an LLM concurrency slot
+        """
+        if queued >= self.max_queue:
+            self.shed += 1
+            raise AdmissionDenied("overloaded")
+
+        if uid and not await self._take(f"user:{uid}", self.user_rate, self.user_burst):
+            self.rate_limited += 1
+            raise AdmissionDenied("rate_limited")
+
+        if not await self._take("global", self.global_rate, self.global_burst):
+            self.shed += 1
+            raise AdmissionDenied("overloaded")
+
+        self.admitted += 1
+
+    async def _take(self, key: str, rate: float, burst: int) -> bool:
+        if self.shared and self.storage and self.storage.redis_client:
+            return await self.storage.take_token(f"ratelimit:{key}", rate, burst)
+
+        if key == "global":
+            return self._global.take()
+
+        bucket = self._users.get(key)
+        if bucket is None:
+            bucket = self._users[key] = TokenBucket(rate, burst)
+            # Forgetting an idle user only refills their bucket
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        else:
+            self._users.move_to_end(key)
+        return bucket.take()
+
+    def stats(self) -> dict:
+        """Admission counters for /health and /metrics"""
+        return {
+            "admitted": self.admitted,
+            "rate_limited": self.rate_limited,
+            "shed": self.shed,
+        }
@@ -0,0 +1,217 @@
+"""File-backed restaurant catalog with precomputed rankings"""
+import bisect
+import csv
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from .trigram_index import TrigramIndex
+
+DEFAULT_CATALOG_PATH = Path(__file__).resolve().parent.parent / "data" / "restaurants.json"
+
+PRICE_LEVELS = {"$": 1, "$$": 2, "$$$": 3}
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a restaurant name the way speech-to-text tends to produce it"""
+    name = name.lower().replace("&", " and ").replace("-", " ")
+    name = re.sub(r"[^\w\s]", "", name)
+    return " ".join(name.split())
+
+
+def slugify(name: str) -> str:
+    """URL slug for a restaurant name ("P.F. Chang's" -> "pf-changs")"""
+    return normalize_name(name).replace(" ", "-")
+
+
+class RestaurantInfo:
+    """Restaurant information"""
+    def __init__(
+        self,
+        name: str,
+        rating: float,
+        cuisine: str,
+        price_range: str,
+        slug: Optional[str] = None,
+        aliases: Optional[List[str]] = None
+    ):
+        self.name = name
+        self.rating = rating
+        self.cuisine = cuisine
+        self.price_range = price_range  # e.g., "$", "$$", "$$$"
+        self.slug = slug or slugify(name)  # DoorDash store slug
+        self.aliases = aliases or []  # Other ways people say the name
+
+
+class RestaurantCatalog:
+    """
+    Restaurants indexed by category and price level
+
+    For every category the index keeps one list per price level holding
+    the restaurants at or below that level, already sorted by rating. A
+    lookup with a max_price is a dict access plus a slice; nothing is
+    copied or re-sorted per request.
+
+    Names and aliases are also held in a trigram index, so a spoken name
+    like "dominoes" or "in and out" resolves to the catalog entry.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, RestaurantInfo]] = ()):
+        """
+        Args:
+            entries: (category, RestaurantInfo) pairs
+        """
+        self._index: Dict[str, Dict[int, List]] = {}
+        self._names: Dict[str, RestaurantInfo] = {}
+        self._trigrams: TrigramIndex[RestaurantInfo] = TrigramIndex(
+            min_similarity=float(os.getenv("RESTAURANT_MATCH_THRESHOLD", 0.6)),
+            min_margin=float(os.getenv("RESTAURANT_MATCH_MARGIN", 0.1))
+        )
+
+        by_category: Dict[str, List] = {}
+        for category, info in entries:
+            by_category.setdefault(category, []).append(info)
+            self._register(info)
+
+        for category, restaurants in by_category.items():
+            restaurants.sort(key=lambda r: r.rating, reverse=True)
+            self._index[category] = {
+                level: [r for r in restaurants if PRICE_LEVELS.get(r.price_range, 1) <= level]
+                for level in PRICE_LEVELS.values()
+            }
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "RestaurantCatalog":
+        """
+        Load a catalog from a JSON or CSV file
+
+        JSON is a list of objects; CSV has a header row. Both use the fields
+        name, category, cuisine, rating, price_range and optionally slug and
+        aliases (a list in JSON, "|"-separated in CSV).
+
+        Args:
+            path: Catalog file (defaults to RESTAURANT_CATALOG_PATH or data/restaurants.json)
+
+        Returns:
+            RestaurantCatalog
+        """
+        path = Path(path or os.getenv("RESTAURANT_CATALOG_PATH") or DEFAULT_CATALOG_PATH)
+
+        with open(path, newline="") as f:
+            rows = list(csv.DictReader(f)) if path.suffix == ".csv" else json.load(f)
+
+        def aliases(row) -> List[str]:
+            value = row.get("aliases") or []
+            return value.split("|") if isinstance(value, str) else value
+
+        return cls(
+            (
+                row["category"],
+                RestaurantInfo(
+                    row["name"],
+                    float(row["rating"]),
+                    row["cuisine"],
+                    row["price_range"],
+                    slug=row.get("slug") or None,
+                    aliases=aliases(row)
+                )
+            )
+            for row in rows
+        )
+
+    def _register(self, info: RestaurantInfo) -> None:
+        self._names[info.name] = info
+        for name in [info.name, *info.aliases]:
+            self._trigrams.add(normalize_name(name), info)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, category: str) -> bool:
+        return category in self._index
+
+    def names(self) -> List[str]:
+        """Names of every restaurant in the catalog"""
+        return list(self._names)
+
+    def spoken_names(self) -> List[str]:
+        """Every name and alias, as written and as speech-to-text spells it ("mcdonald's", "mcdonalds")"""
+        spoken = set()
+        for info in self._names.values():
+            for name in [info.name, *info.aliases]:
+                spoken.update((name.lower(), normalize_name(name)))
+        return sorted(spoken)
+
+    def get(self, name: str) -> Optional[RestaurantInfo]:
+        """Look up a restaurant by its exact name"""
+        return self._names.get(name)
+
+    def resolve(self, spoken_name: str) -> Optional[RestaurantInfo]:
+        """
+        Resolve a spoken or misspelled restaurant name
+
+        Args:
+            spoken_name: Name as transcribed (e.g. "dominoes", "pf changs")
+
+        Returns:
+            Closest catalog restaurant, or None if nothing is similar
+            enough or two restaurants are about as close
+        """
+        match = self._trigrams.search(normalize_name(spoken_name))
+        return match[0] if match else None
+
+    def top(self, category: str, max_price: str = "$$$", limit: int = 5) -> List[RestaurantInfo]:
+        """
+        Highest rated restaurants in a category
+
+        Args:
+            category: Food category (e.g. "pizza")
+            max_price: Max price range
+            limit: Max number of results
+
+        Returns:
+            Restaurants sorted by rating, best first
+        """
+        levels = self._index.get(category)
+        if not levels:
+            return []
+        return levels[PRICE_LEVELS.get(max_price, 3)][:limit]
+
+    def best(self, category: str, max_price: str = "$$$") -> Optional[RestaurantInfo]:
+        """Highest rated restaurant in a category, or None"""
+        levels = self._index.get(category)
+        if not levels:
+            return None
+        restaurants = levels[PRICE_LEVELS.get(max_price, 3)]
+        return restaurants[0] if restaurants else None
+
+    def add(self, category: str, info: RestaurantInfo) -> bool:
+        """
+        Add a restaurant to a category, keeping every ranking sorted
+
+        A restaurant already in the catalog (under another category) keeps
+        its entry and is indexed under this category too.
+
+        Args:
+            category: Food category
+            info: Restaurant to add
+
+        Returns:
+            True if the restaurant was added to the category, False if it
+            was already there
+        """
+        if info.name in self._names:
+            info = self._names[info.name]
+        else:
+            self._register(info)
+
+        levels = self._index.setdefault(category, {level: [] for level in PRICE_LEVELS.values()})
+        if any(r is info for r in levels[max(levels)]):
+            return False
+
+        price_level = PRICE_LEVELS.get(info.price_range, 1)
+        for level, restaurants in levels.items():
+            if price_level <= level:
+                bisect.insort(restaurants, info, key=lambda r: -r.rating)
+        return True
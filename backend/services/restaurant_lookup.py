@@ -1,17 +1,34 @@
 """Restaurant lookup service - find restaurants and pricing"""
 from typing import Optional, List
-from anthropic import Anthropic
+from anthropic import AsyncAnthropic
+import asyncio
 import json
 import os
-
-
-class RestaurantInfo:
-    """Restaurant information"""
-    def __init__(self, name: str, rating: float, cuisine: str, price_range: str):
-        self.name = name
-        self.rating = rating
-        self.cuisine = cuisine
-        self.price_range = price_range  # e.g., "$", "$$", "$$$"
+import time
+from .cache import TwoTierCache, normalize_text
+from .metrics import record_llm_call
+from .restaurant_catalog import RestaurantCatalog, RestaurantInfo
+from .log import get_logger
+
+logger = get_logger("restaurant_lookup")
+
+# Food words that map an order onto a restaurant category
+# (checked in order, so "orange chicken" is chinese before it is chicken)
+FOOD_CATEGORIES = {
+    "pizza": ["pizza", "pepperoni", "margherita"],
+    "burger": ["burger", "cheeseburger"],
+    "chinese": ["chinese", "fried rice", "lo mein", "orange chicken"],
+    "mexican": ["burrito", "taco", "quesadilla"],
+    "sushi": ["sushi", "sashimi", "roll"],
+    "chicken": ["fried chicken", "chicken tenders", "nuggets", "wings", "chicken sandwich"],
+    "sandwich": ["sandwich", "hoagie", "panini", "footlong"],
+    "thai": ["pad thai", "thai", "green curry", "tom yum"],
+    "indian": ["indian", "tikka", "masala", "biryani", "naan", "curry"],
+    "salad": ["salad", "grain bowl"],
+    "italian": ["pasta", "spaghetti", "lasagna", "fettuccine", "italian"],
+    "ramen": ["ramen", "pho", "udon"],
+    "coffee": ["coffee", "latte", "cappuccino", "espresso"],
+}
 
 
 class RestaurantLookupService:
@@ -24,40 +41,54 @@ class RestaurantLookupService:
     - DoorDash merchant API
     """
 
-    def __init__(self):
-        self.client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
-
-        # Mock database for demo (pre-populate with local favorites)
-        self.mock_restaurants = {
-            "pizza": [
-                RestaurantInfo("Domino's Pizza", 4.2, "Pizza", "$$"),
-                RestaurantInfo("Pizza Hut", 4.0, "Pizza", "$$"),
-                RestaurantInfo("Little Caesars", 3.8, "Pizza", "$"),
-            ],
-            "burger": [
-                RestaurantInfo("Five Guys", 4.5, "Burgers", "$$"),
-                RestaurantInfo("In-N-Out Burger", 4.7, "Burgers", "$"),
-                RestaurantInfo("Shake Shack", 4.4, "Burgers", "$$"),
-            ],
-            "chinese": [
-                RestaurantInfo("Panda Express", 4.0, "Chinese", "$"),
-                RestaurantInfo("P.F. Chang's", 4.3, "Chinese", "$$$"),
-            ],
-            "mexican": [
-                RestaurantInfo("Chipotle", 4.2, "Mexican", "$$"),
-                RestaurantInfo("Taco Bell", 3.9, "Mexican", "$"),
-            ],
-            "sushi": [
-                RestaurantInfo("Kura Sushi", 4.4, "Sushi", "$$"),
-                RestaurantInfo("Sushi House", 4.2, "Sushi", "$$"),
-            ],
-        }
+    def __init__(self, suggestion_cache: Optional[TwoTierCache] = None, timeout: Optional[float] = None):
+        """
+        Args:
+            suggestion_cache: Cache for AI suggestions, keyed by (food_item, cuisine)
+            timeout: Seconds to wait for an AI suggestion
+        """
+        self.timeout = timeout or float(os.getenv("LLM_TIMEOUT_SECONDS", 10))
+        self.client = AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"), timeout=self.timeout)
+
+        # Restaurant catalog, indexed once at startup
+        self.catalog = RestaurantCatalog.load()
 
-    def find_restaurant(
+        # AI suggestions don't change between users, so they're memoized and,
+        # once repeated, promoted into the catalog under the food item's key
+        self.suggestion_cache = suggestion_cache or TwoTierCache("restaurant_suggestion")
+        self._promoted = set()
+
+    def restaurant_names(self) -> List[str]:
+        """Names of every restaurant in the catalog"""
+        return self.catalog.names()
+
+    def spoken_names(self) -> List[str]:
+        """Restaurant names and aliases the way users say them"""
+        return self.catalog.spoken_names()
+
+    def food_words(self) -> List[str]:
+        """Food vocabulary used to categorize orders"""
+        return [word for words in FOOD_CATEGORIES.values() for word in words]
+
+    def resolve_restaurant(self, name: str) -> Optional[RestaurantInfo]:
+        """
+        Resolve a spoken restaurant name to a catalog entry
+
+        Args:
+            name: Restaurant name as transcribed (e.g. "dominoes")
+
+        Returns:
+            RestaurantInfo with canonical name and slug, or None if unknown
+        """
+        return self.catalog.resolve(name)
+
+    async def find_restaurant(
         self,
         food_item: str,
         cuisine: Optional[str] = None,
-        max_price: str = "$$$"
+        max_price: str = "$$$",
+        suggested: Optional[str] = None,
+        price_tier: Optional[str] = None
     ) -> Optional[RestaurantInfo]:
         """
         Find best restaurant for food item
@@ -66,6 +97,9 @@ class RestaurantLookupService:
             food_item: What they want (e.g., "pepperoni pizza")
             cuisine: Cuisine type if specified
             max_price: Max price range
+            suggested: Restaurant Claude already suggested while parsing the
+                order (used instead of a separate suggestion call)
+            price_tier: Price tier Claude gave for the suggestion
 
         Returns:
             RestaurantInfo or None
@@ -74,41 +108,66 @@ class RestaurantLookupService:
         # Determine category from food item
         category = self._categorize_food(food_item)
 
-        if category in self.mock_restaurants:
-            restaurants = self.mock_restaurants[category]
-
-            # Filter by price
-            price_levels = {"$": 1, "$$": 2, "$$$": 3}
-            max_level = price_levels.get(max_price, 3)
-            restaurants = [r for r in restaurants if price_levels.get(r.price_range, 1) <= max_level]
-
-            # Sort by rating
-            restaurants.sort(key=lambda x: x.rating, reverse=True)
+        if category in self.catalog:
+            # Highest rated within the price range (pre-sorted in the index)
+            return self.catalog.best(category, max_price)
+
+        # Suggestions that were promoted into the catalog
+        suggestion_key = self._suggestion_key(food_item, cuisine, price_tier)
+        if suggestion_key in self.catalog:
+            return self.catalog.best(suggestion_key)
+
+        # Fallback: Claude's suggestion (memoized)
+        cached = await self.suggestion_cache.get(suggestion_key)
+        if cached is not None:
+            info = RestaurantInfo(**cached)
+            self._promote(suggestion_key, info)
+            return info
+
+        if suggested:
+            info = self.catalog.resolve(suggested) or RestaurantInfo(
+                suggested, 4.3, cuisine or "Various", price_tier or "$$"
+            )
+        else:
+            info = await self._ai_suggest_restaurant(food_item, cuisine)
+        if info:
+            await self.suggestion_cache.set(suggestion_key, {
+                "name": info.name,
+                "rating": info.rating,
+                "cuisine": info.cuisine,
+                "price_range": info.price_range,
+                "slug": info.slug,
+                "aliases": info.aliases,
+            })
+        return info
+
+    def _suggestion_key(self, food_item: str, cuisine: Optional[str], price_tier: Optional[str] = None) -> str:
+        """
+        Cache key / catalog category for an AI suggestion
 
-            # Return highest rated
-            return restaurants[0] if restaurants else None
+        The price tier is part of the key: a suggestion priced with the
+        default tier must not be cached or promoted over Claude's tier.
+        """
+        return f"{normalize_text(food_item)} ({normalize_text(cuisine or 'any')}, {price_tier or 'any'})"
 
-        # Fallback: use AI to suggest
-        return self._ai_suggest_restaurant(food_item, cuisine)
+    def _promote(self, suggestion_key: str, info: RestaurantInfo) -> None:
+        """Add a repeated suggestion to the catalog (bounded by the cache size)"""
+        if len(self._promoted) >= self.suggestion_cache.local.maxsize:
+            return
+        if self.catalog.add(suggestion_key, info):
+            self._promoted.add(suggestion_key)
 
     def _categorize_food(self, food_item: str) -> str:
         """Categorize food item into cuisine type"""
         food_lower = food_item.lower()
 
-        if any(word in food_lower for word in ["pizza", "pepperoni", "margherita"]):
-            return "pizza"
-        elif any(word in food_lower for word in ["burger", "cheeseburger"]):
-            return "burger"
-        elif any(word in food_lower for word in ["chinese", "fried rice", "lo mein", "orange chicken"]):
-            return "chinese"
-        elif any(word in food_lower for word in ["burrito", "taco", "quesadilla"]):
-            return "mexican"
-        elif any(word in food_lower for word in ["sushi", "sashimi", "roll"]):
-            return "sushi"
+        for category, words in FOOD_CATEGORIES.items():
+            if any(word in food_lower for word in words):
+                return category
 
         return "general"
 
-    def _ai_suggest_restaurant(self, food_item: str, cuisine: Optional[str]) -> Optional[RestaurantInfo]:
+    async def _ai_suggest_restaurant(self, food_item: str, cuisine: Optional[str]) -> Optional[RestaurantInfo]:
         """Use AI to suggest a restaurant"""
 
         prompt = f"What's a highly-rated chain restaurant that serves {food_item}"
@@ -116,20 +175,36 @@ class RestaurantLookupService:
             prompt += f" ({cuisine} cuisine)"
         prompt += "? Just give me the restaurant name."
 
+        start = time.perf_counter()
+        response, outcome = None, "error"
         try:
-            response = self.client.messages.create(
-                model="claude-sonnet-4-5-20250929",
-                max_tokens=100,
-                messages=[{"role": "user", "content": prompt}]
+            response = await asyncio.wait_for(
+                self.client.messages.create(
+                    model="claude-sonnet-4-5-20250929",
+                    max_tokens=100,
+                    messages=[{"role": "user", "content": prompt}]
+                ),
+                timeout=self.timeout
             )
+            outcome = "ok"
 
             name = response.content[0].text.strip()
-            return RestaurantInfo(name, 4.3, cuisine or "Various", "$$")
+
+            # Prefer the catalog entry (real rating, price and slug) if we know it
+            return self.catalog.resolve(name) or RestaurantInfo(name, 4.3, cuisine or "Various", "$$")
+
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            logger.warning("Restaurant suggestion timed out after %ss", self.timeout)
+            return None
 
         except Exception as e:
-            print(f"Error suggesting restaurant: {e}")
+            logger.error("Error suggesting restaurant: %s", e)
             return None
 
+        finally:
+            record_llm_call("claude-sonnet-4-5-20250929", "suggestion", time.perf_counter() - start, response, outcome)
+
     def estimate_price(self, food_item: str, restaurant: RestaurantInfo) -> str:
         """
         Estimate price for food item
@@ -0,0 +1,160 @@
+"""Deterministic parser for common order phrasings (skips the LLM)"""
+import re
+from typing import Callable, Dict, Iterable, Optional
+from models.order import OrderIntent
+from .restaurant_catalog import RestaurantInfo, normalize_name
+
+# The only words allowed before the order verb. Commands are matched from
+# the start of the utterance, so anything else in front of the verb - a
+# negation ("i don't want to order"), a question or hypothetical ("should i
+# order", "what if we order") - leaves the utterance to Claude.
+LEAD_IN = (
+    r"(?:(?:hey|ok|okay|so|um|uh|alright)\b[\s,]*)*"
+    r"(?:(?:can|could|would|will)\s+you\s+|please\s+|i'?d\s+like\s+(?:to\s+)?"
+    r"|i\s+(?:want|need)\s+(?:to\s+)?|i\s+wanna\s+|let's\s+|go\s+ahead\s+and\s+)*"
+)
+
+QUICK_ORDER_PATTERN = re.compile(
+    LEAD_IN
+    + r"(?:(?:order|get)\s+(?:me\s+|us\s+)?(?:my|the|our)\s+(?:usual|regular)(?:\s+order)?"
+    r"|same\s+as\s+last\s+time|my\s+regular\s+order)\b[^.!?]*[.!?\s]*$"
+)
+
+# "order a ...", "can you get me some ...", "i'd like to order ..." - one
+# sentence, nothing after it
+COMMAND_PATTERN = re.compile(
+    LEAD_IN
+    + r"(?:order|get)\s+(?:me\s+|us\s+)?(?:an?\s+|some\s+|one\s+|the\s+)?(?P<rest>[^.!?]+)[.!?\s]*$"
+)
+
+# Trailing words that aren't part of the item ("... for dinner please")
+TRAILING_FILLER = re.compile(
+    r"(?:\s+(?:for\s+(?:delivery|lunch|dinner|breakfast|me|us)|please|thanks|thank\s+you|now|tonight|asap))+$"
+)
+
+CUISINES = ["chinese", "mexican", "italian", "thai", "japanese", "indian", "korean", "vietnamese"]
+
+DIETARY_TERMS = {
+    "vegetarian": "vegetarian",
+    "vegan": "vegan",
+    "gluten free": "gluten-free",
+    "dairy free": "dairy-free",
+    "halal": "halal",
+    "kosher": "kosher",
+}
+
+# An item containing these is more than a plain order ("pizza but not from
+# dominos", "salad no dressing", "pizza and remind me ...") - leave it to Claude
+CLAUSE_WORDS = {"and", "but", "not", "no", "with", "without", "or", "except", "instead"}
+
+# Longest item (in words) the rules will commit to
+MAX_ITEM_WORDS = 4
+
+# Words dropped from a restaurant name to form a spoken alias ("Domino's Pizza" -> "dominos")
+GENERIC_NAME_WORDS = {"pizza", "burger", "burgers", "sushi", "express", "grill", "kitchen", "restaurant"}
+
+
+class RuleBasedParser:
+    """
+    Parse formulaic order commands without calling Claude
+
+    Handles "order my usual", "order a burger from Five Guys", "get me sushi"
+    and similar. The command has to open the utterance (after at most a
+    polite lead-in like "can you" or "please") and be its only sentence.
+    A parse is only returned when the item is short (at most
+    MAX_ITEM_WORDS words), ends in a known food word and has no clause
+    words (CLAUSE_WORDS); anything else returns None and goes to the LLM.
+    An unrecognized restaurant lowers the confidence below the usual
+    threshold, so callers fall back to the LLM for those too.
+    """
+
+    def __init__(
+        self,
+        restaurants: Iterable[str],
+        food_words: Iterable[str],
+        resolve_restaurant: Optional[Callable[[str], Optional[RestaurantInfo]]] = None
+    ):
+        """
+        Args:
+            restaurants: Canonical restaurant names to recognize
+            food_words: Food vocabulary (single words or short phrases)
+            resolve_restaurant: Fuzzy name resolver, tried when no alias matches exactly
+        """
+        self.resolve_restaurant = resolve_restaurant
+        self.restaurants: Dict[str, str] = {}
+        for name in restaurants:
+            normalized = normalize_name(name)
+            self.restaurants[normalized] = name
+
+            words = normalized.split()
+            while len(words) > 1 and words[-1] in GENERIC_NAME_WORDS:
+                words = words[:-1]
+                self.restaurants.setdefault(" ".join(words), name)
+
+        words = sorted({normalize_name(w) for w in food_words} | set(CUISINES), key=len, reverse=True)
+        self._food_tail = re.compile(r"(?:^|\s)(?:" + "|".join(map(re.escape, words)) + r")(?:e?s)?$")
+        self._cuisine_pattern = re.compile(r"\b(" + "|".join(CUISINES) + r")\b")
+
+    def parse(self, text: str) -> Optional[OrderIntent]:
+        """
+        Parse an order command
+
+        Args:
+            text: User's voice transcript
+
+        Returns:
+            OrderIntent with a rule-based confidence, or None if the
+            utterance isn't a plain order the rules can handle
+        """
+        text_lower = text.lower().strip()
+
+        if QUICK_ORDER_PATTERN.match(text_lower):
+            return OrderIntent(food_item="", quick_order=True, confidence=0.95)
+
+        match = COMMAND_PATTERN.match(text_lower)
+        if not match:
+            return None
+
+        rest = TRAILING_FILLER.sub("", match.group("rest").strip(" ,"))
+
+        item, restaurant_text = rest, None
+        split = re.split(r"\s+(?:from|at)\s+", rest, maxsplit=1)
+        if len(split) == 2:
+            item, restaurant_text = split
+
+        item = " ".join(re.sub(r"[^\w\s-]", "", item).split())
+        words = item.split()
+
+        # Requirements, not bonuses: a short item that is entirely a food
+        # phrase, with no extra clauses anywhere in the command
+        if not words or len(words) > MAX_ITEM_WORDS:
+            return None
+        if CLAUSE_WORDS & set(re.findall(r"[a-z']+", rest)):
+            return None
+        if not self._food_tail.search(item):
+            return None
+
+        confidence = 0.95
+
+        # Is the restaurant (if any) one we know?
+        restaurant = None
+        if restaurant_text:
+            normalized = normalize_name(restaurant_text)
+            restaurant = self.restaurants.get(normalized)
+            if not restaurant and self.resolve_restaurant:
+                resolved = self.resolve_restaurant(restaurant_text)
+                restaurant = resolved.name if resolved else None
+            if not restaurant:
+                restaurant = restaurant_text.strip().title()
+                confidence = 0.6
+
+        cuisine = self._cuisine_pattern.search(item)
+        dietary = [label for term, label in DIETARY_TERMS.items() if term in item.replace("-", " ")]
+
+        return OrderIntent(
+            food_item=item,
+            restaurant=restaurant,
+            cuisine=cuisine.group(1).title() if cuisine else None,
+            dietary_restrictions=dietary,
+            confidence=confidence
+        )
@@ -1,29 +1,203 @@
 """Redis storage service for user profiles and order history"""
 import json
 import os
+import time
 from typing import Optional
-import redis
+import redis.asyncio as redis
 from datetime import datetime
-from models.order import UserProfile, OrderIntent, FavoriteOrder
+from models.order import UserProfile, OrderIntent, FavoriteOrder, OrderJob
+from .log import get_logger
+
+logger = get_logger("storage")
 
 
 class StorageService:
-    """Handle all Redis storage operations"""
+    """
+    Handle all Redis storage operations
+
+    Uses the asyncio Redis client over a blocking connection pool, so
+    concurrent webhooks share connections without stalling the event loop.
+
+    Profiles are stored field by field rather than as one JSON blob:
+
+        user_profile:{uid}                               hash (scalars, last_order)
+        user_profile:{uid}:favorite_restaurants          zset (score = first seen)
+        user_profile:{uid}:dietary_preferences           zset (score = first seen)
+        user_profile:{uid}:favorite_orders               zset (score = order count)
+        user_profile:{uid}:favorite_orders:last_ordered  hash
+
+    Every mutation is a server-side atomic update (Lua or MULTI/EXEC), so
+    concurrent webhooks for one uid never lose updates.
+    """
+
+    MAX_FAVORITE_ORDERS = 10
+
+    # KEYS: profile hash, favorites zset, last_ordered hash, [session key]
+    # ARGV: last_order json, favorite member ("" = none), now, max favorites,
+    #       session json, session ttl, uid
+    SAVE_LAST_ORDER_LUA = """
+redis.call('HSET', KEYS[1], 'uid', ARGV[7], 'last_order', ARGV[1])
+if ARGV[2] ~= '' then
+    redis.call('ZINCRBY', KEYS[2], 1, ARGV[2])
+    redis.call('HSET', KEYS[3], ARGV[2], ARGV[3])
+    local overflow = redis.call('ZCARD', KEYS[2]) - tonumber(ARGV[4])
+    if overflow > 0 then
+        local dropped = redis.call('ZRANGE', KEYS[2], 0, overflow - 1)
+        redis.call('ZREMRANGEBYRANK', KEYS[2], 0, overflow - 1)
+        redis.call('HDEL', KEYS[3], unpack(dropped))
+    end
+end
+if KEYS[4] then
+    redis.call('SETEX', KEYS[4], ARGV[6], ARGV[5])
+end
+return 1
+"""
+
+    # KEYS: bucket hash
+    # ARGV: refill rate (tokens/sec), burst, now (seconds)
+    TAKE_TOKEN_LUA = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return allowed
+"""
+
+    def __init__(self, redis_url: Optional[str] = None, max_connections: Optional[int] = None):
+        self.redis_url = redis_url or os.getenv("REDIS_URL", "redis://localhost:6379")
+        self.max_connections = max_connections or int(os.getenv("REDIS_MAX_CONNECTIONS", 50))
+        self.redis_client = None
+        self.memory_store = {}  # Fallback to in-memory dict
+        self._migrated = set()  # uids known to be in the field layout
+        self._save_last_order_script = None
+        self._take_token_script = None
+
+    async def connect(self) -> bool:
+        """
+        Open the connection pool (call once on startup)
 
-    def __init__(self):
-        redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
+        Returns:
+            True if Redis is reachable, False if using the in-memory fallback
+        """
         try:
-            self.redis_client = redis.from_url(redis_url, decode_responses=True)
+            pool = redis.BlockingConnectionPool.from_url(
+                self.redis_url,
+                max_connections=self.max_connections,
+                timeout=5,
+                decode_responses=True
+            )
+            client = redis.Redis(connection_pool=pool)
             # Test connection
-            self.redis_client.ping()
-            print("✅ Connected to Redis")
+            await client.ping()
+            self.redis_client = client
+            self._save_last_order_script = client.register_script(self.SAVE_LAST_ORDER_LUA)
+            logger.info("Connected to Redis")
+            return True
         except Exception as e:
-            print(f"⚠️ Redis connection failed: {e}")
-            print("📝 Using in-memory fallback (data won't persist)")
+            logger.warning("Redis connection failed: %s", e)
+            logger.warning("Using in-memory fallback (data won't persist)")
             self.redis_client = None
-            self.memory_store = {}  # Fallback to in-memory dict
+            return False
+
+    async def close(self) -> None:
+        """Close the connection pool (call once on shutdown)"""
+        if self.redis_client:
+            await self.redis_client.aclose()
+            self.redis_client = None
+
+    @staticmethod
+    def _profile_keys(uid: str) -> dict:
+        """Redis keys that make up one user profile"""
+        base = f"user_profile:{uid}"
+        return {
+            "fields": base,
+            "favorite_restaurants": f"{base}:favorite_restaurants",
+            "dietary_preferences": f"{base}:dietary_preferences",
+            "favorite_orders": f"{base}:favorite_orders",
+            "last_ordered": f"{base}:favorite_orders:last_ordered",
+        }
+
+    @staticmethod
+    def _favorite_member(restaurant: str, food_item: str) -> str:
+        """Sorted-set member identifying one favorite order"""
+        return json.dumps([restaurant, food_item])
+
+    async def _ensure_migrated(self, uid: str) -> None:
+        """Convert a legacy JSON-blob profile to the field layout (once per process)"""
+        if uid in self._migrated:
+            return
 
-    def get_user_profile(self, uid: str) -> UserProfile:
+        key = f"user_profile:{uid}"
+        if await self.redis_client.type(key) == "string":
+            data = await self.redis_client.get(key)
+            if data:
+                await self._write_full_profile(UserProfile(**json.loads(data)))
+                logger.info("Migrated profile to field layout", extra={"uid": uid})
+
+        self._migrated.add(uid)
+
+    async def migrate_profiles(self) -> int:
+        """
+        Migrate every legacy JSON-blob profile to the field layout
+
+        Profiles are also migrated lazily on first access, so this only
+        needs to run when you want the whole keyspace converted up front.
+
+        Returns:
+            Number of profiles migrated
+        """
+        if not self.redis_client:
+            return 0
+
+        migrated = 0
+        async for key in self.redis_client.scan_iter(match="user_profile:*", count=500):
+            if key.count(":") != 1:
+                continue
+            uid = key.split(":", 1)[1]
+            if await self.redis_client.type(key) == "string":
+                self._migrated.discard(uid)
+                await self._ensure_migrated(uid)
+                migrated += 1
+
+        return migrated
+
+    async def _write_full_profile(self, profile: UserProfile) -> None:
+        """Replace every part of a profile in one MULTI/EXEC"""
+        keys = self._profile_keys(profile.uid)
+        now = time.time()
+
+        fields = {"uid": profile.uid}
+        if profile.delivery_address is not None:
+            fields["delivery_address"] = profile.delivery_address
+        if profile.phone is not None:
+            fields["phone"] = profile.phone
+        if profile.last_order is not None:
+            fields["last_order"] = profile.last_order.model_dump_json()
+
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.delete(*keys.values())
+            pipe.hset(keys["fields"], mapping=fields)
+            for name in ("favorite_restaurants", "dietary_preferences"):
+                values = getattr(profile, name)
+                if values:
+                    pipe.zadd(keys[name], {v: now + i * 1e-6 for i, v in enumerate(values)})
+            for favorite in profile.favorite_orders:
+                member = self._favorite_member(favorite.restaurant, favorite.food_item)
+                pipe.zadd(keys["favorite_orders"], {member: favorite.order_count})
+                pipe.hset(keys["last_ordered"], member, favorite.last_ordered.isoformat())
+            await pipe.execute()
+
+    async def get_user_profile(self, uid: str) -> UserProfile:
         """
         Get user profile from storage
 
@@ -37,22 +211,70 @@ class StorageService:
 
         try:
             if self.redis_client:
-                data = self.redis_client.get(key)
-                if data:
-                    return UserProfile(**json.loads(data))
+                await self._ensure_migrated(uid)
+                keys = self._profile_keys(uid)
+
+                # All parts of the profile in one round-trip
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    pipe.hgetall(keys["fields"])
+                    pipe.zrange(keys["favorite_restaurants"], 0, -1)
+                    pipe.zrange(keys["dietary_preferences"], 0, -1)
+                    pipe.zrevrange(keys["favorite_orders"], 0, -1, withscores=True)
+                    pipe.hgetall(keys["last_ordered"])
+                    fields, restaurants, dietary, favorites, last_ordered = await pipe.execute()
+
+                last_order = fields.get("last_order")
+                return UserProfile(
+                    uid=uid,
+                    delivery_address=fields.get("delivery_address"),
+                    phone=fields.get("phone"),
+                    favorite_restaurants=restaurants,
+                    dietary_preferences=dietary,
+                    last_order=OrderIntent(**json.loads(last_order)) if last_order else None,
+                    favorite_orders=[
+                        FavoriteOrder(
+                            restaurant=json.loads(member)[0],
+                            food_item=json.loads(member)[1],
+                            order_count=int(count),
+                            last_ordered=last_ordered.get(member) or datetime.now()
+                        )
+                        for member, count in favorites
+                    ]
+                )
             else:
                 # Fallback to memory
                 if key in self.memory_store:
                     return UserProfile(**self.memory_store[key])
         except Exception as e:
-            print(f"Error getting user profile: {e}")
+            logger.error("Error getting user profile: %s", e)
 
         # Return new profile if not found
         return UserProfile(uid=uid)
 
-    def save_user_profile(self, profile: UserProfile) -> bool:
+    async def get_last_order(self, uid: str) -> Optional[OrderIntent]:
         """
-        Save user profile to storage
+        Get only the user's last order (for "order my usual")
+
+        Args:
+            uid: User ID
+
+        Returns:
+            Last OrderIntent, or None if the user hasn't ordered yet
+        """
+        try:
+            if self.redis_client:
+                await self._ensure_migrated(uid)
+                data = await self.redis_client.hget(f"user_profile:{uid}", "last_order")
+                return OrderIntent(**json.loads(data)) if data else None
+            else:
+                return (await self.get_user_profile(uid)).last_order
+        except Exception as e:
+            logger.error("Error getting last order: %s", e)
+            return None
+
+    async def save_user_profile(self, profile: UserProfile) -> bool:
+        """
+        Save user profile to storage (replaces every field)
 
         Args:
             profile: UserProfile to save
@@ -63,34 +285,124 @@ class StorageService:
         key = f"user_profile:{profile.uid}"
 
         try:
-            data = profile.model_dump_json()
-
             if self.redis_client:
-                self.redis_client.set(key, data)
+                await self._write_full_profile(profile)
+                self._migrated.add(profile.uid)
             else:
                 # Fallback to memory
-                self.memory_store[key] = json.loads(data)
+                self.memory_store[key] = json.loads(profile.model_dump_json())
 
             return True
 
         except Exception as e:
-            print(f"Error saving user profile: {e}")
+            logger.error("Error saving user profile: %s", e)
             return False
 
-    def save_last_order(self, uid: str, order: OrderIntent) -> bool:
+    async def update_profile_fields(self, uid: str, fields: dict) -> bool:
+        """
+        Overwrite selected profile fields, leaving the rest untouched
+
+        Args:
+            uid: User ID
+            fields: Any of delivery_address, phone, favorite_restaurants,
+                dietary_preferences
+
+        Returns:
+            True if successful
+        """
+        try:
+            if not self.redis_client:
+                key = f"user_profile:{uid}"
+                profile = await self.get_user_profile(uid)
+                self.memory_store[key] = json.loads(profile.model_copy(update=fields).model_dump_json())
+                return True
+
+            await self._ensure_migrated(uid)
+            keys = self._profile_keys(uid)
+            now = time.time()
+
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                scalars = {k: fields[k] for k in ("delivery_address", "phone") if k in fields}
+                pipe.hset(keys["fields"], mapping={"uid": uid, **scalars})
+                for name in ("favorite_restaurants", "dietary_preferences"):
+                    if name in fields:
+                        pipe.delete(keys[name])
+                        if fields[name]:
+                            pipe.zadd(keys[name], {v: now + i * 1e-6 for i, v in enumerate(fields[name])})
+                await pipe.execute()
+
+            return True
+
+        except Exception as e:
+            logger.error("Error updating profile fields: %s", e)
+            return False
+
+    async def save_last_order(
+        self,
+        uid: str,
+        order: OrderIntent,
+        session_id: Optional[str] = None,
+        session_context: Optional[dict] = None,
+        session_ttl: int = 3600
+    ) -> bool:
         """
         Save user's last order for "order my usual" functionality
 
+        In Redis this is a single Lua script: it sets the last_order field,
+        bumps the favorite's count in a sorted set and trims it to the top
+        entries, so the write size doesn't grow with the profile.
+
         Args:
             uid: User ID
             order: OrderIntent to save
+            session_id: Optional session whose context is saved in the same
+                script call (saves a round-trip at the end of an order)
+            session_context: Session context to save
+            session_ttl: Session context TTL in seconds
 
         Returns:
             True if successful
         """
-        # Get profile
-        profile = self.get_user_profile(uid)
+        try:
+            if not self.redis_client:
+                profile = await self.get_user_profile(uid)
+                self._apply_last_order(profile, order)
+                self.memory_store[f"user_profile:{uid}"] = json.loads(profile.model_dump_json())
+                if session_id is not None:
+                    self.memory_store[f"session:{session_id}"] = session_context or {}
+                return True
+
+            await self._ensure_migrated(uid)
+            keys = self._profile_keys(uid)
+
+            member = ""
+            if order.restaurant and order.food_item:
+                member = self._favorite_member(order.restaurant, order.food_item)
+
+            script_keys = [keys["fields"], keys["favorite_orders"], keys["last_ordered"]]
+            if session_id is not None:
+                script_keys.append(f"session:{session_id}")
+
+            await self._save_last_order_script(
+                keys=script_keys,
+                args=[
+                    order.model_dump_json(),
+                    member,
+                    datetime.now().isoformat(),
+                    self.MAX_FAVORITE_ORDERS,
+                    json.dumps(session_context or {}),
+                    session_ttl,
+                    uid
+                ]
+            )
+            return True
 
+        except Exception as e:
+            logger.error("Error saving last order: %s", e)
+            return False
+
+    def _apply_last_order(self, profile: UserProfile, order: OrderIntent) -> None:
+        """Record an order on an in-memory profile (fallback storage)"""
         # Update last order
         profile.last_order = order
 
@@ -118,14 +430,11 @@ class StorageService:
                     )
                 )
 
-            # Keep only top 10 favorites (sorted by count)
+            # Keep only top favorites (sorted by count)
             profile.favorite_orders.sort(key=lambda x: x.order_count, reverse=True)
-            profile.favorite_orders = profile.favorite_orders[:10]
-
-        # Save profile
-        return self.save_user_profile(profile)
+            profile.favorite_orders = profile.favorite_orders[:self.MAX_FAVORITE_ORDERS]
 
-    def update_preferences(self, uid: str, preferences: dict) -> bool:
+    async def update_preferences(self, uid: str, preferences: dict) -> bool:
         """
         Update user preferences from memory trigger
 
@@ -136,22 +445,40 @@ class StorageService:
         Returns:
             True if successful
         """
-        profile = self.get_user_profile(uid)
-
-        # Merge new preferences (avoid duplicates)
-        if "favorite_restaurants" in preferences:
-            for restaurant in preferences["favorite_restaurants"]:
-                if restaurant not in profile.favorite_restaurants:
-                    profile.favorite_restaurants.append(restaurant)
+        try:
+            if not self.redis_client:
+                profile = await self.get_user_profile(uid)
+
+                # Merge new preferences (avoid duplicates)
+                for name in ("favorite_restaurants", "dietary_preferences"):
+                    current = getattr(profile, name)
+                    for value in preferences.get(name, []):
+                        if value not in current:
+                            current.append(value)
+
+                self.memory_store[f"user_profile:{uid}"] = json.loads(profile.model_dump_json())
+                return True
+
+            await self._ensure_migrated(uid)
+            keys = self._profile_keys(uid)
+            now = time.time()
+
+            # ZADD NX keeps first-seen order and skips duplicates server-side
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                pipe.hset(keys["fields"], "uid", uid)
+                for name in ("favorite_restaurants", "dietary_preferences"):
+                    values = preferences.get(name) or []
+                    if values:
+                        pipe.zadd(keys[name], {v: now + i * 1e-6 for i, v in enumerate(values)}, nx=True)
+                await pipe.execute()
 
-        if "dietary_preferences" in preferences:
-            for pref in preferences["dietary_preferences"]:
-                if pref not in profile.dietary_preferences:
-                    profile.dietary_preferences.append(pref)
+            return True
 
-        return self.save_user_profile(profile)
+        except Exception as e:
+            logger.error("Error updating preferences: %s", e)
+            return False
 
-    def get_session_context(self, session_id: str) -> dict:
+    async def get_session_context(self, session_id: str) -> dict:
         """
         Get temporary session context (for multi-turn conversations)
 
@@ -165,15 +492,15 @@ class StorageService:
 
         try:
             if self.redis_client:
-                data = self.redis_client.get(key)
+                data = await self.redis_client.get(key)
                 return json.loads(data) if data else {}
             else:
                 return self.memory_store.get(key, {})
         except Exception as e:
-            print(f"Error getting session context: {e}")
+            logger.error("Error getting session context: %s", e)
             return {}
 
-    def save_session_context(self, session_id: str, context: dict, ttl: int = 3600) -> bool:
+    async def save_session_context(self, session_id: str, context: dict, ttl: int = 3600) -> bool:
         """
         Save session context (expires after TTL)
 
@@ -189,12 +516,168 @@ class StorageService:
 
         try:
             if self.redis_client:
-                self.redis_client.setex(key, ttl, json.dumps(context))
+                await self.redis_client.setex(key, ttl, json.dumps(context))
             else:
                 self.memory_store[key] = context
 
             return True
 
         except Exception as e:
-            print(f"Error saving session context: {e}")
+            logger.error("Error saving session context: %s", e)
+            return False
+
+    async def get_order_job(self, job_id: str) -> Optional[OrderJob]:
+        """
+        Get a background order job
+
+        Args:
+            job_id: Job ID returned when the order was submitted
+
+        Returns:
+            OrderJob, or None if unknown or expired
+        """
+        key = f"order_job:{job_id}"
+
+        try:
+            if self.redis_client:
+                data = await self.redis_client.get(key)
+            else:
+                data = self.memory_store.get(key)
+            return OrderJob.model_validate_json(data) if data else None
+        except Exception as e:
+            logger.error("Error getting order job: %s", e)
+            return None
+
+    async def save_order_job(self, job: OrderJob, ttl: int = 86400) -> bool:
+        """
+        Save a background order job (expires after TTL)
+
+        Args:
+            job: OrderJob to save
+            ttl: Time to live in seconds (default 1 day)
+
+        Returns:
+            True if successful
+        """
+        key = f"order_job:{job.job_id}"
+
+        try:
+            data = job.model_dump_json()
+
+            if self.redis_client:
+                await self.redis_client.setex(key, ttl, data)
+            else:
+                self.memory_store[key] = data
+
+            return True
+
+        except Exception as e:
+            logger.error("Error saving order job: %s", e)
             return False
+
+    async def get_cached(self, key: str) -> Optional[dict]:
+        """
+        Get a value from the shared (cross-worker) cache tier
+
+        Args:
+            key: Namespaced cache key
+
+        Returns:
+            Cached value, or None on a miss or without Redis
+        """
+        if not self.redis_client:
+            return None
+
+        try:
+            data = await self.redis_client.get(f"cache:{key}")
+            return json.loads(data) if data else None
+        except Exception as e:
+            logger.error("Error reading cache: %s", e)
+            return None
+
+    async def set_cached(self, key: str, value: dict, ttl: int) -> bool:
+        """
+        Store a value in the shared cache tier (no-op without Redis)
+
+        Args:
+            key: Namespaced cache key
+            value: JSON-serializable value
+            ttl: Time to live in seconds
+
+        Returns:
+            True if successful
+        """
+        if not self.redis_client:
+            return False
+
+        try:
+            await self.redis_client.setex(f"cache:{key}", ttl, json.dumps(value))
+            return True
+        except Exception as e:
+            logger.error("Error writing cache: %s", e)
+            return False
+
+    async def claim_once(self, key: str, ttl: int) -> bool:
+        """
+        Claim a key the first time it is seen (SET NX), for deduplication
+
+        Args:
+            key: Namespaced key (e.g. "memory:<id>")
+            ttl: Seconds to remember the claim
+
+        Returns:
+            True if this call claimed the key, False if it was already claimed
+        """
+        if not self.redis_client:
+            # No expiry without Redis
+            claimed = f"claimed:{key}" not in self.memory_store
+            self.memory_store[f"claimed:{key}"] = True
+            return claimed
+
+        try:
+            return bool(await self.redis_client.set(f"claimed:{key}", 1, nx=True, ex=ttl))
+        except Exception as e:
+            logger.error("Error claiming key: %s", e)
+            # Fail open - processing twice beats dropping work
+            return True
+
+    async def take_token(self, key: str, rate: float, burst: int) -> bool:
+        """
+        Take one token from a shared token bucket (atomic, in Redis)
+
+        Args:
+            key: Bucket key (e.g. "ratelimit:user:<uid>")
+            rate: Refill rate in tokens per second
+            burst: Bucket capacity
+
+        Returns:
+            True if a token was taken (also without Redis, or on errors)
+        """
+        if not self.redis_client:
+            return True
+
+        try:
+            if self._take_token_script is None:
+                self._take_token_script = self.redis_client.register_script(self.TAKE_TOKEN_LUA)
+            return bool(await self._take_token_script(keys=[key], args=[rate, burst, time.time()]))
+        except Exception as e:
+            logger.error("Error taking rate limit token: %s", e)
+            # Fail open - a Redis hiccup shouldn't reject every request
+            return True
+
+    async def release_claim(self, key: str) -> None:
+        """
+        Drop a claim made with claim_once so the key can be claimed again
+
+        Args:
+            key: Key passed to claim_once
+        """
+        if not self.redis_client:
+            self.memory_store.pop(f"claimed:{key}", None)
+            return
+
+        try:
+            await self.redis_client.delete(f"claimed:{key}")
+        except Exception as e:
+            logger.error("Error releasing claim: %s", e)
+
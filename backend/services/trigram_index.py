@@ -0,0 +1,87 @@
+"""Trigram index for fuzzy matching of short names"""
+from collections import Counter
+from typing import Dict, Generic, List, Optional, Set, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def trigrams(text: str) -> Set[str]:
+    """Trigrams of a normalized string, padded so word starts and ends count"""
+    padded = "  " + "  ".join(text.split()) + " "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex(Generic[T]):
+    """
+    Map noisy spellings onto known values by trigram similarity
+
+    Each key is broken into trigrams with a posting list per trigram. A
+    query only scores keys that share at least one trigram with it, then
+    ranks them by Jaccard similarity, so lookups stay in the microseconds
+    for catalogs of a few thousand names.
+
+    A fuzzy match must reach min_similarity and beat the best key of any
+    other value by min_margin; "pizza place" is about as close to Pizza Hut
+    as to other pizza names, and a guess there orders from the wrong store.
+    """
+
+    def __init__(self, min_similarity: float = 0.6, min_margin: float = 0.1):
+        self.min_similarity = min_similarity
+        self.min_margin = min_margin
+        self._exact: Dict[str, T] = {}
+        self._keys: List[Tuple[str, int, T]] = []  # (key, trigram count, value)
+        self._postings: Dict[str, List[int]] = {}
+
+    def add(self, key: str, value: T) -> None:
+        """
+        Index a key (already normalized)
+
+        Args:
+            key: Name or alias
+            value: Value returned when the key matches
+        """
+        if key in self._exact:
+            return
+
+        self._exact[key] = value
+        grams = trigrams(key)
+        key_id = len(self._keys)
+        self._keys.append((key, len(grams), value))
+
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(key_id)
+
+    def search(self, query: str) -> Optional[Tuple[T, float]]:
+        """
+        Find the closest key to a (normalized) query
+
+        Args:
+            query: Spoken or typed name
+
+        Returns:
+            (value, similarity) for the best match if it is similar and
+            unambiguous enough, or None
+        """
+        if query in self._exact:
+            return self._exact[query], 1.0
+
+        grams = trigrams(query)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._postings.get(gram, ()))
+
+        # Best score per value, so a name and its aliases don't compete
+        scores: Dict[int, Tuple[float, T]] = {}
+        for key_id, overlap in shared.items():
+            _, size, value = self._keys[key_id]
+            score = overlap / (len(grams) + size - overlap)
+            if score > scores.get(id(value), (0.0,))[0]:
+                scores[id(value)] = (score, value)
+
+        ranked = sorted(scores.values(), key=lambda s: s[0], reverse=True)
+        if not ranked or ranked[0][0] < self.min_similarity:
+            return None
+        if len(ranked) > 1 and ranked[0][0] - ranked[1][0] < self.min_margin:
+            return None
+        best_score, best = ranked[0]
+        return best, best_score
@@ -0,0 +1,229 @@
+"""Sharded work queue drained by background workers"""
+import asyncio
+import json
+import uuid
+import zlib
+from typing import Awaitable, Callable
+from .log import get_logger
+
+logger = get_logger("work_queue")
+
+
+class WorkQueue:
+    """
+    Queue of JSON items processed in the background, in order per key
+
+    Items with the same key always land on the same shard, and each shard
+    is drained by exactly one worker at a time, so per-key order holds.
+    put() tags every item with a "job_id" so its log lines can be traced.
+
+    With Redis every shard is a list. A worker moves an item onto a
+    processing list while handling it (BLMOVE) and removes it afterwards,
+    so in-flight items survive a crash. A lease key ensures one process
+    drains a shard at a time; the next owner puts unfinished items back at
+    the head of the queue. Without Redis, shards are in-process asyncio
+    queues (not durable).
+    """
+
+    LEASE_SECONDS = 30
+    IDLE_POLL_SECONDS = 1
+    DEAD_LETTER_LIMIT = 1000
+
+    RENEW_LEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+    RELEASE_LEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[dict], Awaitable[None]],
+        storage=None,
+        shards: int = 4
+    ):
+        """
+        Args:
+            name: Redis key prefix for this queue
+            handler: Coroutine called with each item
+            storage: StorageService whose Redis connection backs the queue
+            shards: Number of shards (= concurrent workers)
+        """
+        self.name = name
+        self.handler = handler
+        self.storage = storage
+        self.shards = shards
+        self.owner = uuid.uuid4().hex
+
+        self.processed = 0
+        self.errors = 0
+
+        self._local = [asyncio.Queue() for _ in range(shards)]
+        self._tasks = []
+
+    @property
+    def _redis(self):
+        return self.storage.redis_client if self.storage else None
+
+    def _shard(self, key: str) -> int:
+        # crc32 is stable across processes (hash() is salted per process)
+        return zlib.crc32(key.encode()) % self.shards
+
+    def _keys(self, shard: int) -> tuple:
+        base = f"{self.name}:{shard}"
+        return base, f"{base}:processing", f"{base}:lease"
+
+    async def put(self, key: str, item: dict) -> bool:
+        """
+        Add an item to the queue
+
+        Args:
+            key: Ordering key (items with the same key are handled in order)
+            item: JSON-serializable item (a "job_id" is added to a copy)
+
+        Returns:
+            True if queued
+        """
+        shard = self._shard(key)
+        item = {**item, "job_id": item.get("job_id") or uuid.uuid4().hex}
+
+        try:
+            if self._redis:
+                queue, _, _ = self._keys(shard)
+                await self._redis.rpush(queue, json.dumps(item))
+            else:
+                self._local[shard].put_nowait(item)
+            return True
+
+        except Exception as e:
+            logger.error("Error enqueueing to %s: %s", self.name, e)
+            return False
+
+    async def dead_letter(self, item: dict) -> None:
+        """Keep an item that could not be processed (Redis only, bounded)"""
+        if not self._redis:
+            return
+
+        try:
+            key = f"{self.name}:dead"
+            async with self._redis.pipeline(transaction=False) as pipe:
+                pipe.lpush(key, json.dumps(item))
+                pipe.ltrim(key, 0, self.DEAD_LETTER_LIMIT - 1)
+                await pipe.execute()
+        except Exception as e:
+            logger.error("Error dead-lettering %s item: %s", self.name, e)
+
+    async def depth(self) -> int:
+        """Number of items waiting or in flight"""
+        if not self._redis:
+            return sum(q.qsize() for q in self._local)
+
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for shard in range(self.shards):
+                    queue, processing, _ = self._keys(shard)
+                    pipe.llen(queue)
+                    pipe.llen(processing)
+                return sum(await pipe.execute())
+        except Exception as e:
+            logger.error("Error reading %s depth: %s", self.name, e)
+            return -1
+
+    def start(self) -> None:
+        """Start one background worker per shard"""
+        self._tasks = [
+            asyncio.create_task(self._run_shard(shard))
+            for shard in range(self.shards)
+        ]
+
+    async def stop(self) -> None:
+        """Stop the workers and release any shard leases"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        if self._redis:
+            for shard in range(self.shards):
+                _, _, lease = self._keys(shard)
+                try:
+                    await self._redis.eval(self.RELEASE_LEASE_LUA, 1, lease, self.owner)
+                except Exception:
+                    pass
+
+    async def _handle(self, item: dict) -> None:
+        try:
+            await self.handler(item)
+            self.processed += 1
+        except Exception:
+            self.errors += 1
+            logger.error(
+                "Error processing %s item", self.name,
+                extra={"job_id": item.get("job_id")}, exc_info=True
+            )
+
+    async def _run_shard(self, shard: int) -> None:
+        while True:
+            try:
+                if self._redis:
+                    await self._drain_redis_shard(shard)
+                else:
+                    await self._handle(await self._local[shard].get())
+
+            except asyncio.CancelledError:
+                raise
+
+            except Exception as e:
+                logger.error("Error in %s worker %s: %s", self.name, shard, e)
+                await asyncio.sleep(self.IDLE_POLL_SECONDS)
+
+    async def _drain_redis_shard(self, shard: int) -> None:
+        """Drain one shard for as long as this process holds its lease"""
+        queue, processing, lease = self._keys(shard)
+
+        if not await self._redis.set(lease, self.owner, nx=True, ex=self.LEASE_SECONDS):
+            # Another process owns this shard
+            await asyncio.sleep(self.LEASE_SECONDS / 3)
+            return
+
+        lost = asyncio.Event()
+        heartbeat = asyncio.create_task(self._keep_lease(lease, lost))
+
+        try:
+            # Put back anything a previous owner didn't finish, oldest first
+            while await self._redis.lmove(processing, queue, "RIGHT", "LEFT"):
+                pass
+
+            while not lost.is_set():
+                raw = await self._redis.blmove(
+                    queue, processing, self.IDLE_POLL_SECONDS, "LEFT", "RIGHT"
+                )
+                if raw is None:
+                    continue
+
+                await self._handle(json.loads(raw))
+                await self._redis.lrem(processing, 1, raw)
+
+        finally:
+            heartbeat.cancel()
+
+    async def _keep_lease(self, lease: str, lost: asyncio.Event) -> None:
+        while True:
+            await asyncio.sleep(self.LEASE_SECONDS / 3)
+            try:
+                renewed = await self._redis.eval(
+                    self.RENEW_LEASE_LUA, 1, lease, self.owner, self.LEASE_SECONDS
+                )
+            except Exception:
+                renewed = 0
+            if not renewed:
+                lost.set()
+                return
@@ -16,7 +16,7 @@ curl -s -X POST http://localhost:8000/webhook/transcript \
     "session_id": "test123",
     "segments": [
       {
-        "text": "Order a pepperoni pizza from Dominos",
+        "text": "Order a pepperoni pizza from Dominos.",
         "speaker": "User",
         "speaker_id": 0,
         "is_user": true,
@@ -31,14 +31,15 @@ echo "3️⃣ Checking user profile..."
 curl -s http://localhost:8000/profile/test_user | jq .
 echo ""
 
+# New session: test123 already placed an order and its cursor is past this segment
 echo "4️⃣ Testing quick reorder..."
 curl -s -X POST http://localhost:8000/webhook/transcript \
   -H "Content-Type: application/json" \
   -d '{
-    "session_id": "test123",
+    "session_id": "test_reorder",
     "segments": [
       {
-        "text": "Order my usual",
+        "text": "Order my usual.",
         "speaker": "User",
         "speaker_id": 0,
         "is_user": true,
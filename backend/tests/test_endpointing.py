@@ -0,0 +1,85 @@
+"""Endpointer: held speech is released on a wall-clock pause, not before"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.omi_webhook import TranscriptSegment  # noqa: E402
+from services.endpointing import Endpointer  # noqa: E402
+
+PAUSE = 1.0
+
+
+def segment(text: str, start: float, end: float, user: bool = True) -> TranscriptSegment:
+    return TranscriptSegment(text=text, speaker="SPEAKER_0", speaker_id=0 if user else 1, is_user=user, start=start, end=end)
+
+
+def test_unpunctuated_tail_in_punctuated_session_is_flushed_after_pause():
+    endpointer = Endpointer(pause_seconds=PAUSE)
+    ctx = {}
+
+    assert endpointer.feed(ctx, [segment("Hi there.", 0, 1)], [], now=100.0) == "Hi there."
+    assert endpointer.feed(ctx, [segment("order a pad thai", 2, 3)], [], now=102.0) == ""
+
+    # The user goes quiet: no new segments, only the clock moves
+    assert endpointer.flush_delay(ctx, now=102.0) == PAUSE
+    assert endpointer.feed(ctx, [], [], now=102.5) == ""
+    assert endpointer.feed(ctx, [], [], now=103.0) == "order a pad thai"
+    assert ctx["pending"] == []
+    assert endpointer.flush_delay(ctx) is None
+
+
+def test_partial_segment_in_unpunctuated_session_is_not_released_early():
+    endpointer = Endpointer(pause_seconds=PAUSE)
+    ctx = {}
+
+    assert endpointer.feed(ctx, [segment("order a pep", 0, 1)], [], now=100.0) == ""
+    assert endpointer.feed(ctx, [segment("pepperoni pizza", 1.1, 2)], [], now=100.3) == ""
+    assert endpointer.feed(ctx, [], [], now=101.3) == "order a pep pepperoni pizza"
+
+
+def test_trailing_off_waits_three_pauses():
+    endpointer = Endpointer(pause_seconds=PAUSE)
+    ctx = {}
+
+    assert endpointer.feed(ctx, [segment("get me a burger from", 0, 1)], [], now=100.0) == ""
+    assert endpointer.flush_delay(ctx, now=100.0) == 3 * PAUSE
+    assert endpointer.feed(ctx, [], [], now=101.5) == ""
+    assert endpointer.feed(ctx, [], [], now=103.0) == "get me a burger from"
+
+
+def test_scheduled_flush_releases_held_speech():
+    async def run():
+        endpointer = Endpointer(pause_seconds=0.05)
+        ctx = {}
+        released = []
+
+        async def flush():
+            released.append(endpointer.feed(ctx, [], []))
+
+        assert endpointer.feed(ctx, [segment("order a pad thai", 0, 1)], []) == ""
+        endpointer.schedule("s1", endpointer.flush_delay(ctx), flush)
+        await asyncio.sleep(0.3)
+        assert released == ["order a pad thai"]
+        await endpointer.stop()
+
+    asyncio.run(run())
+
+
+def test_new_speech_replaces_the_timer():
+    async def run():
+        endpointer = Endpointer(pause_seconds=0.1)
+        flushed = []
+
+        def flush(name):
+            async def run_flush():
+                flushed.append(name)
+            return run_flush
+
+        endpointer.schedule("s1", 0.1, flush("first"))
+        endpointer.schedule("s1", 0.1, flush("second"))
+        await asyncio.sleep(0.4)
+        assert flushed == ["second"]
+
+    asyncio.run(run())
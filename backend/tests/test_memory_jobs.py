@@ -0,0 +1,94 @@
+"""MemoryJobQueue: failed extractions must stay retryable"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import MemoryCreated  # noqa: E402
+from services.memory_jobs import MemoryJobQueue  # noqa: E402
+from services.storage import StorageService  # noqa: E402
+
+PREFERENCES = {
+    "favorite_cuisines": ["Vietnamese"],
+    "favorite_restaurants": ["Pho Hoa"],
+    "dietary_preferences": [],
+    "favorite_dishes": [],
+}
+
+
+class FlakyParser:
+    """Fails the first `failures` extractions, then succeeds"""
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.calls = 0
+
+    async def extract_memory_preferences(self, memory, raise_errors: bool = False) -> dict:
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError("Claude unavailable")
+        return PREFERENCES
+
+
+class Notifications:
+    async def send_notification(self, uid: str, message: str, title=None) -> bool:
+        return True
+
+
+def memory_webhook(memory_id: str = "mem-1") -> MemoryCreated:
+    return MemoryCreated.model_validate({
+        "uid": "u1",
+        "memory": {
+            "id": memory_id,
+            "created_at": "now",
+            "transcript_segments": [
+                {"text": "I love Pho Hoa", "speaker": "User", "speaker_id": 0, "is_user": True, "start": 0, "end": 1}
+            ],
+        },
+    })
+
+
+def make_queue(parser, max_attempts: int = 2) -> MemoryJobQueue:
+    return MemoryJobQueue(parser, StorageService(), Notifications(), workers=1, max_attempts=max_attempts, base_delay=0)
+
+
+async def drain(jobs: MemoryJobQueue) -> None:
+    """Process everything queued (no workers running)"""
+    for shard in jobs.queue._local:
+        while not shard.empty():
+            await jobs._process(shard.get_nowait())
+
+
+def test_failed_extraction_releases_claim_so_retry_is_processed():
+    async def run():
+        parser = FlakyParser(failures=2)
+        jobs = make_queue(parser, max_attempts=2)
+
+        assert await jobs.enqueue(memory_webhook()) == "accepted"
+        await drain(jobs)
+        assert jobs.failed == 1
+        assert (await jobs.storage.get_user_profile("u1")).favorite_restaurants == []
+
+        # Omi retries the webhook: it must not be dropped as a duplicate
+        assert await jobs.enqueue(memory_webhook()) == "accepted"
+        await drain(jobs)
+        assert (await jobs.storage.get_user_profile("u1")).favorite_restaurants == ["Pho Hoa"]
+
+    asyncio.run(run())
+
+
+def test_transient_failure_is_retried_in_place():
+    async def run():
+        parser = FlakyParser(failures=1)
+        jobs = make_queue(parser, max_attempts=3)
+
+        assert await jobs.enqueue(memory_webhook()) == "accepted"
+        await drain(jobs)
+        assert (jobs.retries, jobs.failed) == (1, 0)
+        assert (await jobs.storage.get_user_profile("u1")).favorite_restaurants == ["Pho Hoa"]
+
+        # Processed successfully, so the claim holds and retries are duplicates
+        assert await jobs.enqueue(memory_webhook()) == "duplicate"
+
+    asyncio.run(run())